@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import subprocess
+
+# Seconds Telegram holds a getUpdates long poll open
+POLL_TIMEOUT = 25
+
+
+async def run_shell(cmd, timeout=None, check=False):
+    """
+    Run a shell command without blocking the event loop.
+    Returns a subprocess.CompletedProcess with text stdout/stderr; with
+    check=True a non-zero exit raises subprocess.CalledProcessError, like
+    subprocess.run. A command still running after `timeout` seconds is
+    killed and subprocess.TimeoutExpired is raised.
+    """
+    proc = await asyncio.create_subprocess_shell(
+        cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    result = subprocess.CompletedProcess(
+        cmd, proc.returncode,
+        stdout.decode("utf-8", errors="ignore"), stderr.decode("utf-8", errors="ignore")
+    )
+    if check:
+        result.check_returncode()
+    return result
+
+
+class AsyncBotCore:
+    """
+    Telegram long polling on a single asyncio event loop.
+    Callback queries with a registered coroutine handler run natively on
+    the loop (async Telegram API, async subprocesses, async HTTP), so a
+    slow one never holds up the others; blocking library code they need
+    goes through run_blocking(). Every other update is handed to the
+    synchronous bot's own bounded worker pool, so its existing handlers
+    keep working unchanged and bursts of taps do not add threads.
+    """
+
+    def __init__(self, sync_bot, token, authorize=None, max_inflight=32):
+        from telebot.async_telebot import AsyncTeleBot
+        self.sync_bot = sync_bot
+        self.bot = AsyncTeleBot(token)
+        # authorize(call) -> bool, checked before a native handler runs
+        self.authorize = authorize
+        self.max_inflight = max_inflight
+        self.loop = None
+        self._callbacks = {}
+        self._prefix_callbacks = []
+        self._inflight = None
+        self._http = None
+        # Running handler tasks; the loop itself only keeps weak references
+        self._tasks = set()
+
+    def callback(self, data, prefix=False):
+        """
+        Decorator registering `async def handler(core, call)` for one
+        callback_data value, or with prefix=True for every value starting with it.
+        """
+        def register(handler):
+            if prefix:
+                self._prefix_callbacks.append((data, handler))
+            else:
+                self._callbacks[data] = handler
+            return handler
+        return register
+
+    def _handler_for(self, data):
+        handler = self._callbacks.get(data)
+        if handler is None:
+            for prefix, candidate in self._prefix_callbacks:
+                if data.startswith(prefix):
+                    return candidate
+        return handler
+
+    async def run_blocking(self, func, *args):
+        """
+        Run a blocking function on the loop's default thread pool and await its result.
+        """
+        return await self.loop.run_in_executor(None, func, *args)
+
+    async def fetch_text(self, url, timeout=10):
+        """
+        GET a URL on the loop's shared aiohttp session and return the body text.
+        """
+        import aiohttp
+        if self._http is None:
+            self._http = aiohttp.ClientSession()
+        async with self._http.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def _run_callback(self, handler, call):
+        async with self._inflight:
+            try:
+                await handler(self, call)
+            except Exception as e:
+                logging.error(f"Error in async callback {call.data}: {str(e)}")
+                try:
+                    await self.bot.send_message(call.message.chat.id, "❌ An error occurred. Check logs.")
+                except Exception:
+                    pass
+
+    def _dispatch(self, update):
+        call = update.callback_query
+        handler = self._handler_for(call.data) if call is not None and call.data else None
+        if handler is None:
+            # Queued on the sync bot's worker pool; returns immediately
+            self.sync_bot.process_new_updates([update])
+            return
+        if self.authorize is not None and not self.authorize(call):
+            return
+        task = self.loop.create_task(self._run_callback(handler, call))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        try:
+            await self.bot.close_session()
+        except Exception:
+            pass
+
+    async def _poll(self):
+        self.loop = asyncio.get_running_loop()
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        offset = None
+        try:
+            while True:
+                try:
+                    updates = await self.bot.get_updates(
+                        offset=offset, timeout=POLL_TIMEOUT, request_timeout=POLL_TIMEOUT + 10
+                    )
+                except Exception as e:
+                    logging.error(f"Async polling error: {str(e)}")
+                    await asyncio.sleep(3)
+                    continue
+                for update in updates:
+                    offset = update.update_id + 1
+                    try:
+                        self._dispatch(update)
+                    except Exception as e:
+                        logging.error(f"Update dispatch error: {str(e)}")
+        finally:
+            await self._close()
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the core's loop from any thread.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self):
+        """
+        Poll until interrupted, in the calling thread.
+        """
+        asyncio.run(self._poll())
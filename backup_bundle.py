@@ -0,0 +1,96 @@
+import io
+import json
+import time
+import tarfile
+import hashlib
+
+BUNDLE_FORMAT = "gensyn-bot-backup"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".gensyn.tar.gz"
+MANIFEST_NAME = "manifest.json"
+# Node files are a few KB; anything far bigger is not a bundle of ours
+MAX_BUNDLE_BYTES = 1024 * 1024
+
+
+class BundleError(Exception):
+    """
+    Raised when an uploaded bundle is malformed or fails verification.
+    """
+
+
+def build_bundle(files, identity=None):
+    """
+    Pack {file name: bytes} into a gzip-compressed tar, in memory, with a
+    manifest.json holding each file's sha256 and size plus the node
+    identity (peer name/id, host). Returns the bundle bytes.
+    """
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "identity": identity or {},
+        "files": {
+            name: {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+            for name, data in sorted(files.items())
+        },
+    }
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz", compresslevel=9) as tar:
+        # The manifest goes first so a reader can check it before anything else
+        members = [(MANIFEST_NAME, json.dumps(manifest, indent=1).encode("utf-8"))]
+        members += sorted(files.items())
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o600
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def read_bundle(data, allowed_names):
+    """
+    Open and verify a bundle. Every member must be a regular file listed
+    in the manifest under one of allowed_names, and match its size and
+    sha256; nothing is returned unless all of them do.
+    Returns (manifest, {file name: bytes}); raises BundleError otherwise.
+    """
+    if len(data) > MAX_BUNDLE_BYTES:
+        raise BundleError("bundle is too large")
+    try:
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tar:
+            contents = {}
+            for member in tar.getmembers():
+                if not member.isfile():
+                    raise BundleError(f"unexpected entry {member.name}")
+                if member.name in contents:
+                    raise BundleError(f"duplicate entry {member.name}")
+                if member.name != MANIFEST_NAME and member.name not in allowed_names:
+                    raise BundleError(f"unexpected file {member.name}")
+                if member.size > MAX_BUNDLE_BYTES:
+                    raise BundleError(f"{member.name} is too large")
+                contents[member.name] = tar.extractfile(member).read()
+    except (tarfile.TarError, EOFError, OSError) as e:
+        raise BundleError(f"not a valid backup bundle ({str(e)})")
+
+    if MANIFEST_NAME not in contents:
+        raise BundleError("manifest missing")
+    try:
+        manifest = json.loads(contents.pop(MANIFEST_NAME))
+    except ValueError:
+        raise BundleError("manifest is not valid JSON")
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError("not a gensyn-bot backup")
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise BundleError(f"unsupported bundle version {manifest.get('version')}")
+
+    expected = manifest.get("files") or {}
+    if set(expected) != set(contents):
+        raise BundleError("files do not match the manifest")
+    for name, data in contents.items():
+        entry = expected[name]
+        if len(data) != entry.get("size") or hashlib.sha256(data).hexdigest() != entry.get("sha256"):
+            raise BundleError(f"checksum mismatch for {name}")
+    if not contents:
+        raise BundleError("bundle holds no files")
+    return manifest, contents
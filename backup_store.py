@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from backup_sync import atomic_write
+
+MANIFEST_VERSION = 1
+
+
+def blob_id(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class BackupStore:
+    """
+    Content-addressed history of small files.
+    Each distinct file content is stored once, as blobs/<id[:2]>/<id> with
+    id = sha256 of the content, and manifest.json lists the snapshots
+    (time -> {file name: blob id}), oldest first. A snapshot identical to
+    the one before it is not recorded, so an unchanged file costs nothing.
+    After every snapshot the retention policy keeps the `keep_last`
+    newest snapshots plus the newest one of each of the last
+    `keep_hourly` hours and `keep_daily` days that have one; blobs no
+    snapshot refers to are then deleted, so disk use stays bounded.
+    The manifest is read once and kept in memory; every write to it and
+    to blobs is atomic.
+    """
+
+    def __init__(self, root, keep_last=10, keep_hourly=24, keep_daily=30):
+        self.root = root
+        self.keep_last = keep_last
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+        self._snapshots = None
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.root, "manifest.json")
+
+    def _blob_path(self, blob):
+        return os.path.join(self.root, "blobs", blob[:2], blob)
+
+    def _load(self):
+        # Caller holds self._lock
+        if self._snapshots is not None:
+            return self._snapshots
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            self._snapshots = manifest.get("snapshots", [])
+        except FileNotFoundError:
+            self._snapshots = []
+        except Exception as e:
+            # Blobs are intact; only the history listing is lost
+            logging.error(f"Backup manifest unreadable, starting a new one: {str(e)}")
+            self._snapshots = []
+        return self._snapshots
+
+    def _save(self):
+        # Caller holds self._lock
+        data = json.dumps({"version": MANIFEST_VERSION, "snapshots": self._snapshots}, indent=1)
+        atomic_write(self.manifest_path, data.encode("utf-8"))
+
+    def _put_blob(self, data):
+        blob = blob_id(data)
+        path = self._blob_path(blob)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, data)
+        return blob
+
+    def snapshot(self, files, when=None):
+        """
+        Record {file name: bytes} as a snapshot taken at `when` (epoch
+        seconds, default now). Returns the snapshot id, or None if the
+        content is the same as the snapshot before it.
+        """
+        when = time.time() if when is None else when
+        with self._lock:
+            snapshots = self._load()
+            blobs = {name: self._put_blob(data) for name, data in sorted(files.items())}
+            previous = [s for s in snapshots if s["time"] <= when]
+            if previous and previous[-1]["files"] == blobs:
+                return None
+            digest = hashlib.sha256(json.dumps(blobs, sort_keys=True).encode("utf-8")).hexdigest()
+            snapshot_id = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime(when))}-{digest[:6]}"
+            snapshots.append({"id": snapshot_id, "time": when, "files": blobs})
+            snapshots.sort(key=lambda s: s["time"])
+            self._prune()
+            self._save()
+            self._collect_garbage()
+            return snapshot_id
+
+    def _retained(self):
+        # Caller holds self._lock. Ids of the snapshots the policy keeps
+        newest_first = list(reversed(self._snapshots))
+        keep = {s["id"] for s in newest_first[:self.keep_last]}
+        for fmt, count in (("%Y%m%d%H", self.keep_hourly), ("%Y%m%d", self.keep_daily)):
+            buckets = set()
+            for snapshot in newest_first:
+                if len(buckets) >= count:
+                    break
+                bucket = time.strftime(fmt, time.gmtime(snapshot["time"]))
+                if bucket not in buckets:
+                    buckets.add(bucket)
+                    keep.add(snapshot["id"])
+        return keep
+
+    def _prune(self):
+        # Caller holds self._lock
+        keep = self._retained()
+        self._snapshots[:] = [s for s in self._snapshots if s["id"] in keep]
+
+    def _collect_garbage(self):
+        # Caller holds self._lock; runs after the manifest is saved, so a
+        # crash never leaves the manifest pointing at a deleted blob
+        referenced = {blob for s in self._snapshots for blob in s["files"].values()}
+        blobs_dir = os.path.join(self.root, "blobs")
+        try:
+            prefixes = os.listdir(blobs_dir)
+        except FileNotFoundError:
+            return
+        for prefix in prefixes:
+            prefix_dir = os.path.join(blobs_dir, prefix)
+            for blob in os.listdir(prefix_dir):
+                if blob not in referenced:
+                    try:
+                        os.remove(os.path.join(prefix_dir, blob))
+                    except OSError as e:
+                        logging.error(f"Could not remove backup blob {blob}: {str(e)}")
+
+    def list(self):
+        """
+        Return the snapshots, newest first: [{"id", "time", "files": {name: blob id}}].
+        """
+        with self._lock:
+            return [dict(s, files=dict(s["files"])) for s in reversed(self._load())]
+
+    def read(self, snapshot_id):
+        """
+        Return {file name: bytes} for a snapshot. Raises KeyError for an
+        unknown id and ValueError if a blob does not match its hash.
+        """
+        with self._lock:
+            for snapshot in self._load():
+                if snapshot["id"] == snapshot_id:
+                    files = dict(snapshot["files"])
+                    break
+            else:
+                raise KeyError(snapshot_id)
+            result = {}
+            for name, blob in files.items():
+                with open(self._blob_path(blob), "rb") as f:
+                    data = f.read()
+                if blob_id(data) != blob:
+                    raise ValueError(f"Backup blob for {name} is corrupt")
+                result[name] = data
+            return result
+
+    def restore(self, snapshot_id, targets):
+        """
+        Write a snapshot's files to targets ({file name: path}), each
+        atomically. Every blob is verified before anything is written.
+        Returns the names restored.
+        """
+        files = self.read(snapshot_id)
+        restored = []
+        for name, data in files.items():
+            path = targets.get(name)
+            if path is None:
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, data)
+            restored.append(name)
+        return restored
@@ -0,0 +1,165 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+
+def atomic_write(path, data, mode=0o600):
+    """
+    Replace path with data so readers see either the old or the new
+    content, never a partial file: write a temp file in the same
+    directory, fsync it, rename it over path, then fsync the directory.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def atomic_write_many(targets, mode=0o600):
+    """
+    Write several files ({path: bytes}) so that either all of them are
+    replaced or none are: every file is first staged and fsynced next to
+    its target, and only when all are staged are they renamed into place.
+    """
+    staged = []
+    try:
+        for path, data in targets.items():
+            directory = os.path.dirname(path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+            staged.append((tmp_path, path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+    except BaseException:
+        for tmp_path, _ in staged:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        raise
+    directories = set()
+    for tmp_path, path in staged:
+        os.replace(tmp_path, path)
+        directories.add(os.path.dirname(path) or ".")
+    for directory in directories:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def valid_json(data):
+    """
+    True if data is a non-empty JSON document (a truncated or empty file is not).
+    """
+    try:
+        return json.loads(data) not in (None, {}, [], "")
+    except (ValueError, UnicodeDecodeError):
+        return False
+
+
+def copy_if_valid(src, dst, validate=valid_json):
+    """
+    Atomically copy src over dst if its content passes validate().
+    Returns True if dst was written.
+    """
+    with open(src, "rb") as f:
+        data = f.read()
+    if not validate(data):
+        logging.error(f"Not copying {src}: content failed validation")
+        return False
+    atomic_write(dst, data)
+    return True
+
+
+def fingerprint(st):
+    # Any write changes at least one of these; a rename over the file changes the inode
+    return (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+class FileSync:
+    """
+    Keeps copies of a few small files in a backup directory, writing a copy
+    only when the source content really changed.
+    Each pass is one stat per file while nothing changes; a changed stat
+    fingerprint leads to a read and hash, and only a new hash is written,
+    atomically. Content that fails validation (e.g. a file caught mid-write)
+    is never published over the last good copy.
+    """
+
+    def __init__(self, files, dest_dir, validate=valid_json):
+        # files: [(source path, backup file name)]
+        self.files = files
+        self.dest_dir = dest_dir
+        self.validate = validate
+        self._fingerprints = {}
+        self._digests = {}
+        self._rejected = {}
+        self._lock = threading.Lock()
+
+    def _published_digest(self, name):
+        # Caller holds self._lock. Seeded from the existing backup, so a
+        # restart does not rewrite unchanged files
+        if name not in self._digests:
+            try:
+                with open(os.path.join(self.dest_dir, name), "rb") as f:
+                    self._digests[name] = hashlib.blake2b(f.read(), digest_size=16).digest()
+            except FileNotFoundError:
+                self._digests[name] = None
+        return self._digests[name]
+
+    def sync(self):
+        """
+        Bring the backups up to date. Returns the names written this pass.
+        """
+        written = []
+        with self._lock:
+            for src, name in self.files:
+                try:
+                    fp = fingerprint(os.stat(src))
+                except FileNotFoundError:
+                    continue
+                if self._fingerprints.get(name) == fp:
+                    continue
+                with open(src, "rb") as f:
+                    data = f.read()
+                digest = hashlib.blake2b(data, digest_size=16).digest()
+                if digest == self._published_digest(name):
+                    self._fingerprints[name] = fp
+                    continue
+                if not self.validate(data):
+                    # Left unrecorded, so the file is checked again next pass
+                    if self._rejected.get(name) != digest:
+                        self._rejected[name] = digest
+                        logging.error(f"Not syncing {src}: content failed validation")
+                    continue
+                atomic_write(os.path.join(self.dest_dir, name), data)
+                self._fingerprints[name] = fp
+                self._digests[name] = digest
+                self._rejected.pop(name, None)
+                written.append(name)
+        return written
+
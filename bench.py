@@ -0,0 +1,307 @@
+"""
+Micro-benchmarks for the bot's hot paths.
+
+Usage:
+    python bench.py tail [--size-mb 1024] [--path /tmp/bench_swarm_launcher.log]
+    python bench.py classify [--lines 1000000] [--path /tmp/bench_swarm_launcher.log]
+    python bench.py render [--rows 50] [--frames 50]
+    python bench.py startup [--module bot] [--budget-ms 400]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import random
+import subprocess
+from datetime import datetime, timedelta
+
+from logtail import tail_lines, LogFollower
+from swarm_log import classify_line, parse_line
+
+DEFAULT_LOG_PATH = "/tmp/bench_swarm_launcher.log"
+
+
+def make_log_line(ts, round_no, i):
+    """
+    Return one line in the swarm_launcher.log format.
+    """
+    stamp = ts.strftime("%Y-%m-%d %H:%M:%S") + f",{i % 1000:03d}"
+    kind = i % 20
+    if kind == 0:
+        return f"[{stamp}][hivemind_exp.runner.gensyn.testnet_grpo_runner][INFO] - Joining round: {round_no}\n"
+    if kind == 1:
+        return f"[{stamp}][genrl.logging_utils.global_defs][INFO] - Starting round: {round_no}/1000000.\n"
+    if kind == 2:
+        return f"[{stamp}][hivemind_exp.trainer][INFO] - 🐱 Hello 🐈 [sly loud alpaca] 🦮 [QmYyQSo1c1Ym7orWxLYvCrM2EmxFTANf8wXmmE7DWjhx5N]!\n"
+    if kind == 3:
+        return f"[{stamp}][hivemind.dht][WARNING] - Failed to reach peer, retrying in {i % 7}s\n"
+    return f"[{stamp}][genrl.trainer][INFO] - step={i} loss={random.random():.6f} reward={random.random():.4f}\n"
+
+
+def ensure_synthetic_log(path, size_mb):
+    """
+    Create a synthetic log of roughly size_mb megabytes (reused if already big enough).
+    """
+    target = size_mb * 1024 * 1024
+    if os.path.exists(path) and os.path.getsize(path) >= target:
+        return path
+    print(f"Generating {size_mb} MB synthetic log at {path}...")
+    ts = datetime(2025, 1, 1)
+    written = 0
+    i = 0
+    round_no = 1
+    with open(path, "w") as f:
+        while written < target:
+            batch = []
+            for _ in range(10000):
+                batch.append(make_log_line(ts, round_no, i))
+                i += 1
+                if i % 20 == 0:
+                    round_no += 1
+                    ts += timedelta(seconds=30)
+            chunk = "".join(batch)
+            f.write(chunk)
+            written += len(chunk.encode("utf-8"))
+    return path
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(label, seconds):
+    print(f"{label:<28}{seconds * 1000:12.3f} ms")
+
+
+def bench_tail(args):
+    path = ensure_synthetic_log(args.path, args.size_mb)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"Log: {path} ({size_mb:.0f} MB)")
+
+    def readlines_tail(n):
+        with open(path, "r", errors="ignore") as f:
+            return f.readlines()[-n:]
+
+    for n in (50, 1000):
+        if not args.skip_readlines:
+            report(f"readlines()[-{n}:]", timed(lambda: readlines_tail(n), repeat=1))
+        report(f"tail_lines(n={n})", timed(lambda: tail_lines(path, n)))
+
+    def follower_cold():
+        follower = LogFollower(path, max_lines=1000)
+        follower.poll()
+        return follower
+
+    report("LogFollower cold poll", timed(follower_cold))
+    follower = follower_cold()
+    report("LogFollower warm poll", timed(follower.poll, repeat=10))
+
+
+def legacy_classify(line):
+    """
+    Per-line work done by get_gensyn_log_status() and
+    parse_peer_info_from_swarm_log() before the single-pass classifier.
+    """
+    result = None
+    if "] - " in line:
+        try:
+            ts_str = line.split("]")[0][1:]
+            ts = datetime.strptime(ts_str.split(",")[0], "%Y-%m-%d %H:%M:%S")
+            msg = line.split("] - ", 1)[-1].strip()
+            result = (ts, "Joining round" in msg, "Starting round" in msg)
+        except (ValueError, IndexError):
+            pass
+    if "Hello" in line:
+        after = line.split("Hello", 1)[1]
+        brackets = []
+        for m in re.finditer(r"\[([^\]]+)\]", after):
+            brackets.append(m.group(1))
+            if len(brackets) == 2:
+                break
+    return result
+
+
+def bench_classify(args):
+    path = ensure_synthetic_log(args.path, args.size_mb)
+    lines = []
+    with open(path, "r", errors="ignore") as f:
+        for line in f:
+            lines.append(line)
+            if len(lines) >= args.lines:
+                break
+    print(f"{len(lines)} lines from {path}")
+
+    def run(fn):
+        return lambda: [fn(line) for line in lines]
+
+    for label, fn in (
+        ("legacy split+strptime", legacy_classify),
+        ("classify_line", classify_line),
+        ("parse_line (events)", parse_line),
+    ):
+        t = timed(run(fn))
+        print(f"{label:<28}{len(lines) / t:12,.0f} lines/s")
+
+
+def legacy_render(lines):
+    """
+    What create_screen_image() did per call before ScreenRenderer.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    try:
+        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 14)
+    except Exception:
+        font = ImageFont.load_default()
+    width = max(len(line) for line in lines) * 10 + 40
+    img = Image.new("RGB", (width, len(lines) * 18 + 40), (0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for row, line in enumerate(lines):
+        draw.text((20, 20 + row * 18), line, fill=(0, 255, 0), font=font)
+    path = "/tmp/bench_screenshot.png"
+    img.save(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+    return data
+
+
+def bench_render(args):
+    from screen_render import ScreenRenderer
+
+    ts = datetime(2025, 1, 1)
+    log = [make_log_line(ts + timedelta(seconds=i), i // 20, i).rstrip("\n")[:120] for i in range(args.rows + args.frames)]
+    # Each frame scrolls the screen by one line, like a live log
+    frames = [log[i:i + args.rows] for i in range(args.frames)]
+
+    def run_legacy():
+        for frame in frames:
+            legacy_render(frame)
+
+    renderer = ScreenRenderer()
+
+    def run_cached():
+        for frame in frames:
+            renderer.render("\n".join(frame))
+
+    def run_unchanged():
+        for _ in frames:
+            renderer.render("\n".join(frames[-1]))
+
+    print(f"{args.frames} frames of {args.rows} lines")
+    report("legacy (per frame)", timed(run_legacy, repeat=1) / args.frames)
+    report("ScreenRenderer (per frame)", timed(run_cached, repeat=1) / args.frames)
+    report("unchanged screen", timed(run_unchanged, repeat=1) / args.frames)
+
+
+# Libraries the bot should only load on first use (or in the background pre-warm)
+LAZY_MODULES = ("web3", "PIL", "playwright")
+
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output into (self_us, cumulative_us, depth, name)
+    tuples, in the order printed (children before their parent).
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+
+def importer_of(entries, index):
+    """
+    Return the name of the module whose import pulled in entries[index].
+    """
+    depth = entries[index][2]
+    for self_us, cumulative_us, d, name in entries[index + 1:]:
+        if d < depth:
+            return name
+    return None
+
+
+def bench_startup(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    failed = False
+    for module in args.module:
+        best = None
+        for _ in range(args.repeat):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                capture_output=True, text=True, env=env, cwd=args.cwd
+            )
+            if result.returncode != 0:
+                print(f"import {module} failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+                return 1
+            entries = parse_importtime(result.stderr)
+            total = next((c for s_us, c, d, name in entries if name == module and d == 0), None)
+            if total is not None and (best is None or total < best[0]):
+                best = (total, entries)
+        if best is None:
+            print(f"import {module}: no importtime output")
+            continue
+        total, entries = best
+        print(f"import {module}: {total / 1000:.1f} ms (best of {args.repeat})")
+        direct = [e for e in entries if e[2] == 1 and importer_of(entries, entries.index(e)) == module]
+        for self_us, cumulative_us, depth, name in sorted(direct, reverse=True, key=lambda e: e[1])[:args.top]:
+            print(f"  {name:<32}{cumulative_us / 1000:10.1f} ms")
+        for i, (self_us, cumulative_us, depth, name) in enumerate(entries):
+            if name in LAZY_MODULES:
+                print(f"  ! {name} loaded at import ({cumulative_us / 1000:.1f} ms) via {importer_of(entries, i)}")
+        if args.budget_ms and total / 1000 > args.budget_ms:
+            print(f"  over budget: {total / 1000:.1f} ms > {args.budget_ms} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="gensyn-bot micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_tail = sub.add_parser("tail", help="cold 'last N lines' reads on a large log")
+    p_tail.add_argument("--path", default=DEFAULT_LOG_PATH)
+    p_tail.add_argument("--size-mb", type=int, default=1024)
+    p_tail.add_argument("--skip-readlines", action="store_true", help="skip the full-read baseline")
+    p_tail.set_defaults(func=bench_tail)
+
+    p_classify = sub.add_parser("classify", help="log line classification throughput")
+    p_classify.add_argument("--path", default=DEFAULT_LOG_PATH)
+    p_classify.add_argument("--size-mb", type=int, default=1024)
+    p_classify.add_argument("--lines", type=int, default=1000000)
+    p_classify.set_defaults(func=bench_classify)
+
+    p_render = sub.add_parser("render", help="screen screenshot rendering")
+    p_render.add_argument("--rows", type=int, default=50)
+    p_render.add_argument("--frames", type=int, default=50)
+    p_render.set_defaults(func=bench_render)
+
+    p_startup = sub.add_parser("startup", help="cold import time of the bot's entry modules")
+    p_startup.add_argument("--module", action="append", help="module to import (repeatable, default: bot and reward)")
+    p_startup.add_argument("--repeat", type=int, default=3)
+    p_startup.add_argument("--top", type=int, default=10, help="heaviest direct imports to list")
+    p_startup.add_argument("--budget-ms", type=float, default=0, help="exit non-zero if an import takes longer")
+    p_startup.add_argument("--cwd", default="/tmp", help="directory to run the imports from")
+    p_startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args(argv)
+    if args.command == "startup" and not args.module:
+        args.module = ["bot", "reward"]
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,91 +1,99 @@
 monitor_active = False
-monitor_thread = None
 auto_restart_scheduled = False
 auto_start_enabled = False
 
-def reward_win_monitor(chat_id):
-    import time
-    import json
-    from urllib.parse import quote_plus
-    last_reward = None
-    last_win = None
-    peer_name = None
-    peer_id = None
-    log_dir = "/root/rl-swarm/logs"
-    while True:
-        global monitor_active
-        if not monitor_active:
-            break
+# State the reward/win poll carries between runs; reset on each start
+reward_monitor_state = {"chat_id": None, "last_reward": None, "last_win": None, "peer_name": None, "peer_id": None}
+
+def reward_win_poll():
+    """
+    One reward/win check for the reward monitor job.
+    Returns the delay in seconds until the next check.
+    """
+    state = reward_monitor_state
+    try:
+        # Discover peer info from cached JSON (generated from swarm_launcher.log)
         try:
-            # Discover peer info from cached JSON (generated from swarm_launcher.log)
+            info = get_cached_peer_info()
+            if info:
+                state["peer_name"] = info.get("peer_name") or state["peer_name"]
+                state["peer_id"] = info.get("peer_id") or state["peer_id"]
+        except Exception:
+            pass
+
+        # Resolve peer_id from name if not available
+        if not state["peer_id"] and state["peer_name"]:
             try:
-                info = get_cached_peer_info()
-                if info:
-                    peer_name = info.get("peer_name") or peer_name
-                    peer_id = info.get("peer_id") or peer_id
+                state["peer_id"], _ = resolve_peer_id(state["peer_name"])
             except Exception:
                 pass
 
-            # Resolve peer_id from name if not available
-            if not peer_id and peer_name:
-                try:
-                    name_url = f"https://dashboard.gensyn.ai/api/v1/peer?name={quote_plus(peer_name)}"
-                    r_name = requests.get(name_url, timeout=10)
-                    if r_name.status_code == 200:
-                        record = r_name.json()
-                        raw_peer_id = record.get("peerId") or ""
-                        peer_id = raw_peer_id.split("|")[-1] if "|" in raw_peer_id else raw_peer_id or None
-                except Exception:
-                    pass
-
-            # If still no peer_id, wait and retry
-            if not peer_id:
-                time.sleep(10)
-                continue
+        # If still no peer_id, wait and retry
+        if not state["peer_id"]:
+            return 10
 
-            # Fetch metrics by peer id to ensure reward/score are populated
-            try:
-                id_url = f"https://dashboard.gensyn.ai/api/v1/peer?id={quote_plus(peer_id)}"
-                r = requests.get(id_url, timeout=10)
-                if r.status_code == 200:
-                    data = r.json()
-                    reward = data.get("reward", 0)
-                    score = data.get("score", 0)
-                    # Alert if reward or win increased
-                    reward_diff = None
-                    win_diff = None
-                    if last_reward is not None and reward > last_reward:
-                        reward_diff = reward - last_reward
-                    if last_win is not None and score > last_win:
-                        win_diff = score - last_win
-                    last_reward = reward
-                    last_win = score
-                    msg = []
-                    if reward_diff:
-                        msg.append(f"🎁 reward {reward}+{reward_diff}")
-                    if win_diff:
-                        msg.append(f"🏆 win {score}+{win_diff}")
-                    if msg:
-                        bot.send_message(chat_id, " ".join(msg))
-            except Exception as e:
-                logging.error(f"Monitor fetch error: {str(e)}")
-            time.sleep(600)  # 10 min
+        # Fetch metrics by peer id to ensure reward/score are populated
+        try:
+            id_url = f"https://dashboard.gensyn.ai/api/v1/peer?id={quote_plus(state['peer_id'])}"
+            # Never serve stale data here so alerts are not a cycle late;
+            # the fetch also keeps the cache warm for status taps
+            data = dashboard_cache.get_json(id_url, max_stale=0)
+            if data:
+                reward = data.get("reward", 0)
+                score = data.get("score", 0)
+                last_reward = state["last_reward"]
+                last_win = state["last_win"]
+                # Alert if reward or win increased
+                reward_diff = None
+                win_diff = None
+                if last_reward is not None and reward > last_reward:
+                    reward_diff = reward - last_reward
+                if last_win is not None and score > last_win:
+                    win_diff = score - last_win
+                state["last_reward"] = reward
+                state["last_win"] = score
+                msg = []
+                if reward_diff:
+                    msg.append(f"🎁 reward {reward}+{reward_diff}")
+                if win_diff:
+                    msg.append(f"🏆 win {score}+{win_diff}")
+                if msg:
+                    send_alert(" ".join(msg), chat_id=state["chat_id"])
         except Exception as e:
-            logging.error(f"Monitor error: {str(e)}")
-            time.sleep(30)
+            logging.error(f"Monitor fetch error: {str(e)}")
+        return REWARD_POLL_SECONDS
+    except Exception as e:
+        logging.error(f"Monitor error: {str(e)}")
+        return 30
 import os
 import time
 import threading
 import subprocess
 import logging
-import requests
+import http_client
 import shutil
 import json
 import re
 import html
 from datetime import datetime, timedelta
-from telebot import TeleBot
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
+from telebot import TeleBot, apihelper, util
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+from logtail import get_follower, tail_lines
+from swarm_log import SwarmEventStore, classify_line, JOIN, START, HELLO
+from eoa import EoaCache, get_web3, resolve_eoas
+from screen_capture import ScreenCapture, FreezeDetector, find_screen_session
+from screen_render import ScreenRenderer
+from scheduler import Scheduler, gather
+from async_core import AsyncBotCore, run_shell
+from jobs import JobExecutor, set_progress, cancel_requested, RUNNING
+from outbox import Outbox
+from live_status import LiveStatus, ProgressMessage
+from wandb_watch import WandbWatcher, WandbIndex
+from backup_sync import FileSync, copy_if_valid, atomic_write, atomic_write_many
+from backup_store import BackupStore
+from backup_bundle import build_bundle, read_bundle, BundleError, BUNDLE_SUFFIX, MAX_BUNDLE_BYTES
 
 BOT_CONFIG = "/root/bot_config.env"
 WG_CONFIG_PATH = "/etc/wireguard/wg0.conf"
@@ -93,13 +101,117 @@ SWARM_PEM_PATH = "/root/rl-swarm/swarm.pem"
 USER_DATA_PATH = "/root/rl-swarm/modal-login/temp-data/userData.json"
 USER_APIKEY_PATH = "/root/rl-swarm/modal-login/temp-data/userApiKey.json"
 BACKUP_USERDATA_DIR = "/root/gensyn-bot/backup-userdata"
+# Files carried by the Get Backup / Restore Backup bundle, by name in the bundle
+BACKUP_BUNDLE_FILES = {
+    "swarm.pem": SWARM_PEM_PATH,
+    "userData.json": USER_DATA_PATH,
+    "userApiKey.json": USER_APIKEY_PATH,
+}
 SYNC_BACKUP_DIR = "/root/gensyn-bot/sync-backup"
+# Login files mirrored into SYNC_BACKUP_DIR whenever their content changes
+user_data_sync = FileSync(
+    [(USER_DATA_PATH, "userData.json"), (USER_APIKEY_PATH, "userApiKey.json")],
+    SYNC_BACKUP_DIR,
+)
+# Deduplicated history of the login files: a snapshot is taken whenever
+# the sync sees them change, and old ones are thinned out (the retention
+# counts can be overridden in bot_config.env)
+BACKUP_STORE_DIR = "/root/gensyn-bot/backup-history"
+BACKUP_KEEP_LAST = 10
+BACKUP_KEEP_HOURLY = 24
+BACKUP_KEEP_DAILY = 30
+backup_store = BackupStore(BACKUP_STORE_DIR, keep_last=BACKUP_KEEP_LAST,
+                           keep_hourly=BACKUP_KEEP_HOURLY, keep_daily=BACKUP_KEEP_DAILY)
+# The old per-call copies, userData_<YYYYmmdd_HHMMSS>.json and friends
+LEGACY_BACKUP_RE = re.compile(r"^(userData|userApiKey)_(\d{8}_\d{6})\.json$")
 GENSYN_LOG_PATH = "/root/rl-swarm/logs/swarm_launcher.log"
 WANDB_LOG_DIR = "/root/rl-swarm/logs/wandb"
+# Telegram rejects bot uploads over 50 MB; bigger wandb logs are sent as a tail
+WANDB_LOG_MAX_SEND_BYTES = 45 * 1024 * 1024
+WANDB_LOG_TAIL_LINES = 5000
+# Runs offered by the "Pick a run" button, newest first
+WANDB_RECENT_RUNS = 8
+wandb_index = WandbIndex(WANDB_LOG_DIR, max_runs=WANDB_RECENT_RUNS)
 
 # Cache file for discovered peer info
 PEER_CACHE_FILE = "/root/gensyn-bot/peer_info.json"
 
+# Dashboard peer lookups (?id= / ?name=) are served from an in-process cache;
+# entries older than the TTL are returned at once and refreshed in the background
+DASHBOARD_CACHE_TTL = 60
+DASHBOARD_CACHE_MAX_STALE = 6 * 3600
+dashboard_cache = http_client.JsonCache(ttl=DASHBOARD_CACHE_TTL, max_stale=DASHBOARD_CACHE_MAX_STALE)
+
+# Peer id -> EOA lookups against the swarm contract, cached per peer on disk
+EOA_CACHE_FILE = "/root/gensyn-bot/eoa_cache.json"
+EOA_CONTRACT_ADDRESS = "0xFaD7C5e93f28257429569B854151A1B8DCD404c2"
+eoa_cache = EoaCache(EOA_CACHE_FILE, legacy_contract=EOA_CONTRACT_ADDRESS)
+
+# The gensyn screen's output is streamed through screen's logfile mode
+GENSYN_SCREEN_LOG = "/root/gensyn-bot/gensyn_screen.log"
+SCREEN_SCROLLBACK_LINES = 2000
+gensyn_capture = ScreenCapture("gensyn", GENSYN_SCREEN_LOG, scrollback=SCREEN_SCROLLBACK_LINES)
+
+# Frozen-process detection: the screen is sampled every monitor cycle and
+# counts as frozen after this long without a meaningful change
+SCREEN_FREEZE_MINUTES = 30
+gensyn_freeze = FreezeDetector(history=24 * 60)
+
+# Screen screenshots are rendered in memory, reusing unchanged lines
+screen_renderer = ScreenRenderer()
+
+# Periodic checks run as independent jobs on one scheduler
+MONITOR_INTERVAL_SECONDS = 60
+REWARD_POLL_SECONDS = 600  # 10 min
+AUTO_RESTART_DELAY_MINUTES = 5
+scheduler = Scheduler(workers=8)
+
+# Long-running button actions run on a small fixed pool. A second tap on
+# an action already queued or running is ignored, and jobs that stop or
+# start the node (group "gensyn") never run at the same time
+JOB_WORKERS = 2
+job_executor = JobExecutor(workers=JOB_WORKERS)
+LOGIN_TIMEOUT_SECONDS = 300
+
+# The status snapshot's probes run in parallel and must all answer within the deadline
+STATUS_PROBE_DEADLINE_SECONDS = 8
+status_executor = ThreadPoolExecutor(max_workers=4)
+
+# web3 and Pillow load on first use; with PREWARM_IMPORTS (default on) they
+# are imported in the background this long after startup
+PREWARM_DELAY_SECONDS = 30
+
+# Number of recent swarm log lines kept in memory for the parsers below
+SWARM_LOG_RING_LINES = 1000
+
+# Append-only store of round/peer events parsed from swarm_launcher.log.
+# Events older than the retention are dropped at startup and once a day
+SWARM_EVENTS_FILE = "/root/gensyn-bot/swarm_events.bin"
+SWARM_EVENTS_RETENTION_DAYS = 30
+swarm_events = SwarmEventStore(SWARM_EVENTS_FILE, max_age_days=SWARM_EVENTS_RETENTION_DAYS)
+
+def start_swarm_log_consumers(log_path=GENSYN_LOG_PATH):
+    """
+    Feed the event store and the peer identity watch from the shared log follower.
+    At startup the existing log is replayed in the background from the
+    newest stored event (all of it on first run), so rounds logged while
+    the bot was down are not missed.
+    """
+    swarm_events.begin_backfill()
+    threading.Thread(target=swarm_events.backfill, args=(log_path,), daemon=True).start()
+    follower = get_follower(log_path, max_lines=SWARM_LOG_RING_LINES)
+    follower.subscribe(swarm_events.feed)
+    follower.subscribe(watch_peer_identity)
+
+def read_recent_log_lines(log_path=GENSYN_LOG_PATH, n=None):
+    """
+    Return the last n lines of a log through its shared follower.
+    Only bytes appended since the previous call are read from disk.
+    """
+    follower = get_follower(log_path, max_lines=SWARM_LOG_RING_LINES)
+    follower.poll()
+    return follower.recent(n)
+
 def parse_peer_info_from_swarm_log(log_path=GENSYN_LOG_PATH):
     """
     Parse peer name and peer id from swarm_launcher.log lines, e.g.:
@@ -109,47 +221,46 @@ def parse_peer_info_from_swarm_log(log_path=GENSYN_LOG_PATH):
     try:
         if not os.path.exists(log_path):
             return None
-        # Read last 1000 lines to search for the most recent Hello line
-        with open(log_path, "r") as f:
-            lines = f.readlines()[-1000:]
+        # Search the last 1000 lines for the most recent Hello line
+        lines = read_recent_log_lines(log_path, 1000)
         for line in reversed(lines):
             if "Hello" not in line:
                 continue
-            try:
-                after = line.split("Hello", 1)[1]
-            except Exception:
-                continue
-            # Capture the first two bracketed groups after "Hello"
-            brackets = []
-            for m in re.finditer(r"\[([^\]]+)\]", after):
-                brackets.append(m.group(1))
-                if len(brackets) == 2:
-                    break
-            if len(brackets) >= 2:
-                peer_name = brackets[0].strip()
-                peer_id = brackets[1].strip()
-                if peer_name and peer_id:
-                    return {"peer_name": peer_name, "peer_id": peer_id}
+            parsed = classify_line(line)
+            if parsed and parsed.kind == HELLO:
+                return {"peer_name": parsed.peer_name, "peer_id": parsed.peer_id}
         return None
     except Exception:
         return None
 
+peer_cache_lock = threading.Lock()
+
 def write_cached_peer_info(info, cache_path=PEER_CACHE_FILE):
+    """
+    Atomically replace the peer cache (temp file + fsync + rename), so a
+    crash mid-write never leaves a truncated peer_info.json.
+    """
     try:
         os.makedirs(os.path.dirname(cache_path), exist_ok=True)
         payload = {
             **info,
             "updated_at": datetime.utcnow().isoformat() + "Z"
         }
-        with open(cache_path, "w") as f:
-            json.dump(payload, f, indent=2)
+        tmp_path = f"{cache_path}.tmp"
+        with peer_cache_lock:
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, cache_path)
         return True
     except Exception:
         return False
 
-def get_cached_peer_info(cache_path=PEER_CACHE_FILE):
+def load_peer_cache_file(cache_path=PEER_CACHE_FILE):
     """
-    Return cached peer info if present; otherwise parse the log and cache it.
+    Return the peer cache contents, or None if missing or unusable.
+    Never touches the swarm log, so it is safe to call from log listeners.
     """
     try:
         if os.path.exists(cache_path):
@@ -157,6 +268,18 @@ def get_cached_peer_info(cache_path=PEER_CACHE_FILE):
                 data = json.load(f)
                 if isinstance(data, dict) and (data.get("peer_name") or data.get("peer_id")):
                     return data
+        return None
+    except Exception:
+        return None
+
+def get_cached_peer_info(cache_path=PEER_CACHE_FILE):
+    """
+    Return cached peer info if present; otherwise parse the log and cache it.
+    """
+    try:
+        data = load_peer_cache_file(cache_path)
+        if data:
+            return data
         info = parse_peer_info_from_swarm_log()
         if info:
             write_cached_peer_info(info, cache_path)
@@ -165,20 +288,76 @@ def get_cached_peer_info(cache_path=PEER_CACHE_FILE):
     except Exception:
         return None
 
-logging.basicConfig(
-    filename='/root/bot_error.log',
-    level=logging.ERROR,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-with open(BOT_CONFIG) as f:
-    lines = f.read().strip().split("\n")
-    config = dict(line.split("=", 1) for line in lines if "=" in line)
-
-BOT_TOKEN = config["BOT_TOKEN"]
-USER_ID = int(config["USER_ID"])
+def resolve_peer_id(peer_name):
+    """
+    Resolve a peer id from its name through the dashboard API and write the
+    answer back into the peer cache, so it is looked up only once per identity.
+    Returns (peer_id, peer_name); raises if the lookup fails.
+    """
+    name_url = f"https://dashboard.gensyn.ai/api/v1/peer?name={quote_plus(peer_name)}"
+    record = dashboard_cache.get_json(name_url)
+    # Split composite id in format "wallet|ipfsPeerId"
+    wallet, _, peer_id = (record.get("peerId") or "").rpartition("|")
+    peer_id = peer_id or None
+    if peer_id:
+        cached = load_peer_cache_file() or {}
+        if cached.get("peer_name") in (None, peer_name):
+            write_cached_peer_info({**cached, "peer_name": peer_name, "peer_id": peer_id, "wallet": wallet or None})
+    return peer_id, record.get("peerName") or peer_name
+
+def watch_peer_identity(lines):
+    """
+    Log listener: when a new Hello line announces a different name or id,
+    replace the peer cache so stale resolutions are dropped.
+    """
+    for line in lines:
+        if "Hello" not in line:
+            continue
+        parsed = classify_line(line)
+        if not parsed or parsed.kind != HELLO:
+            continue
+        cached = load_peer_cache_file() or {}
+        if (cached.get("peer_name"), cached.get("peer_id")) != (parsed.peer_name, parsed.peer_id):
+            write_cached_peer_info({"peer_name": parsed.peer_name, "peer_id": parsed.peer_id})
+
+def load_config(path=BOT_CONFIG):
+    """
+    Read KEY=VALUE pairs from the bot config file
+    """
+    with open(path) as f:
+        lines = f.read().strip().split("\n")
+    return dict(line.split("=", 1) for line in lines if "=" in line)
+
+# Filled in by main(); importing this module reads no config and starts nothing
+config = {}
+BOT_TOKEN = None
+USER_ID = None
+
+# Telegram API calls share the pooled keep-alive session
+apihelper.session = http_client.get_session()
+# Handlers register on this instance at import time. It is created without
+# its worker threads; main() sets the token and starts them
+BOT_WORKER_THREADS = 2
+bot = TeleBot(BOT_TOKEN, threaded=False)
+
+# Alerts the bot raises on its own go through one queue: per-chat rate
+# limited, merged when several fire within a few seconds, retried on 429
+ALERT_MERGE_SECONDS = 3
+outbox = Outbox(lambda chat_id, text, **kwargs: bot.send_message(chat_id, text, **kwargs),
+                window=ALERT_MERGE_SECONDS)
+
+# Live dashboard mode (/live): one pinned status message per chat, edited
+# in place every LIVE_STATUS_SECONDS and only when its content changed
+LIVE_STATUS_FILE = "/root/gensyn-bot/live_status.json"
+LIVE_STATUS_SECONDS = 60
+live_status = LiveStatus(bot, LIVE_STATUS_FILE)
+
+def send_alert(text, chat_id=None, **kwargs):
+    """
+    Queue an alert (default: to the owner) without waiting for Telegram
+    """
+    outbox.post(chat_id if chat_id is not None else USER_ID, text, **kwargs)
 
-bot = TeleBot(BOT_TOKEN)
 waiting_for_pem = False
 login_in_progress = False
 login_lock = threading.Lock()
@@ -186,9 +365,6 @@ tmate_running = False
 last_action_time = {}
 COOLDOWN_SECONDS = 2
 
-os.makedirs(BACKUP_USERDATA_DIR, exist_ok=True)
-os.makedirs(SYNC_BACKUP_DIR, exist_ok=True)
-
 def get_menu():
     markup = InlineKeyboardMarkup()
     markup.row(
@@ -246,41 +422,70 @@ def stop_vpn():
         return False, f"❌ VPN failed to stop: {str(e)}"
 
 def backup_user_data_sync():
+    """
+    Copy the login files into SYNC_BACKUP_DIR if, and only if, they changed
+    """
     try:
-        for src, name in [(USER_DATA_PATH, "userData.json"), (USER_APIKEY_PATH, "userApiKey.json")]:
-            dst = os.path.join(SYNC_BACKUP_DIR, name)
-            if os.path.exists(src):
-                shutil.copy(src, dst)
+        if user_data_sync.sync():
+            backup_user_data()
         return True
     except Exception as e:
         logging.error(f"Sync backup error: {str(e)}")
         return False
 
-def periodic_sync_backup():
-    while True:
-        try:
-            backup_user_data_sync()
-            time.sleep(60)
-        except Exception as e:
-            logging.error(f"Periodic sync backup thread error: {str(e)}")
-            time.sleep(10)
-
-threading.Thread(target=periodic_sync_backup, daemon=True).start()
-
 def backup_user_data():
+    """
+    Snapshot the login files into the backup history (a no-op if they did not change)
+    """
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        files = {}
         for path, name in [(USER_DATA_PATH, "userData.json"), (USER_APIKEY_PATH, "userApiKey.json")]:
             if os.path.exists(path):
-                backup_file = f"{name.split('.')[0]}_{timestamp}.json"
-                shutil.copy(path, os.path.join(BACKUP_USERDATA_DIR, backup_file))
-                latest_file = f"{name.split('.')[0]}_latest.json"
-                shutil.copy(path, os.path.join(BACKUP_USERDATA_DIR, latest_file))
+                with open(path, "rb") as f:
+                    files[name] = f.read()
+        if files:
+            backup_store.snapshot(files)
         return True
     except Exception as e:
         logging.error(f"Backup error: {str(e)}")
         return False
 
+def import_legacy_backups():
+    """
+    Move old timestamped copies from BACKUP_USERDATA_DIR into the backup
+    history (oldest first), then delete them; duplicates collapse into one blob
+    """
+    try:
+        groups = {}
+        for name in os.listdir(BACKUP_USERDATA_DIR):
+            match = LEGACY_BACKUP_RE.match(name)
+            if match:
+                groups.setdefault(match.group(2), {})[f"{match.group(1)}.json"] = name
+        for timestamp in sorted(groups):
+            files = {}
+            for target, name in groups[timestamp].items():
+                with open(os.path.join(BACKUP_USERDATA_DIR, name), "rb") as f:
+                    files[target] = f.read()
+            when = datetime.strptime(timestamp, "%Y%m%d_%H%M%S").timestamp()
+            backup_store.snapshot(files, when=when)
+            for name in groups[timestamp].values():
+                os.remove(os.path.join(BACKUP_USERDATA_DIR, name))
+    except Exception as e:
+        logging.error(f"Legacy backup import error: {str(e)}")
+
+def restore_snapshot(chat_id, snapshot_id):
+    """
+    Put a snapshot's login files back in place, after snapshotting the current ones
+    """
+    try:
+        backup_user_data()
+        restored = backup_store.restore(snapshot_id, {"userData.json": USER_DATA_PATH, "userApiKey.json": USER_APIKEY_PATH})
+        bot.send_message(chat_id, f"✅ Restored {', '.join(restored)} from {snapshot_id}. Restart Gensyn to use them.")
+    except KeyError:
+        bot.send_message(chat_id, "⚠️ That backup no longer exists. See /backups")
+    except Exception as e:
+        bot.send_message(chat_id, f"❌ Restore failed: {str(e)}")
+
 def run_command(cmd, chat_id=None, desc=None):
     try:
         result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
@@ -296,19 +501,13 @@ def run_command(cmd, chat_id=None, desc=None):
 
 def install_gensyn(chat_id):
     try:
-        last_msg_id = None
+        progress = ProgressMessage(bot, chat_id)
         def send_step(text):
-            nonlocal last_msg_id
             try:
-                if last_msg_id:
-                    try:
-                        bot.delete_message(chat_id, last_msg_id)
-                    except Exception:
-                        pass
-                msg = bot.send_message(chat_id, text)
-                last_msg_id = msg.message_id
-            except Exception:
-                last_msg_id = None
+                progress.update(text)
+            except Exception as e:
+                logging.error(f"Install progress update failed: {str(e)}")
+            set_progress(text)
 
         send_step("🍳 Installing Gensyn prerequisites... This may take a while.")
         steps = [
@@ -324,12 +523,19 @@ def install_gensyn(chat_id):
             ("sudo apt install -y yarn", "Install yarn"),
         ]
         for cmd, desc in steps:
+            if cancel_requested():
+                send_step(f"🛑 Install cancelled before: {desc}")
+                return
             send_step(f"⏳ {desc}...")
             ok, out = run_command(cmd, None, desc)
             if not ok:
                 send_step(f"❌ {desc} failed: {html.escape(out[-1000:])}")
                 return
 
+        if cancel_requested():
+            send_step("🛑 Install cancelled before cloning rl-swarm")
+            return
+
         # Clone rl-swarm only if missing
         if os.path.exists("/root/rl-swarm"):
             send_step("ℹ️ /root/rl-swarm already exists. Skipping clone.")
@@ -407,6 +613,11 @@ def gensyn_soft_update(chat_id):
         for path in backup_paths:
             if os.path.exists(path):
                 shutil.copy(path, backup_dir)
+        # Last point where stopping leaves the node untouched
+        if cancel_requested():
+            bot.send_message(chat_id, "🛑 Update cancelled. Gensyn was not stopped.")
+            return
+        set_progress("Stopping Gensyn")
         bot.send_message(chat_id, "Backup done. Killing Gensyn...")
         # Only kill gensyn screen if present
         if check_gensyn_screen_running():
@@ -415,6 +626,7 @@ def gensyn_soft_update(chat_id):
             bot.send_message(chat_id, "Gensyn killed.")
         else:
             bot.send_message(chat_id, "No gensyn screen found. Proceeding with update...")
+        set_progress("Updating (git pull)")
         bot.send_message(chat_id, "Updating (git switch/reset/clean/pull)...")
         update_cmd = (
             "cd /root/rl-swarm && "
@@ -438,6 +650,7 @@ def gensyn_soft_update(chat_id):
             if os.path.exists(src):
                 shutil.copy(src, dst)
         
+        set_progress("Restoring backup and starting Gensyn")
         time.sleep(1)  # Wait for file system sync
         
         # Verify no screen exists before starting
@@ -462,6 +675,11 @@ def gensyn_hard_update(chat_id):
         for path in backup_paths:
             if os.path.exists(path):
                 shutil.copy(path, backup_dir)
+        # Last point where stopping leaves the node untouched
+        if cancel_requested():
+            bot.send_message(chat_id, "🛑 Update cancelled. Gensyn was not stopped.")
+            return
+        set_progress("Stopping Gensyn")
         bot.send_message(chat_id, "Backup done. Killing Gensyn...")
         # Only kill gensyn screen if present
         if check_gensyn_screen_running():
@@ -470,6 +688,7 @@ def gensyn_hard_update(chat_id):
             bot.send_message(chat_id, "Gensyn killed.")
         else:
             bot.send_message(chat_id, "No gensyn screen found. Proceeding with update...")
+        set_progress("Cloning repo")
         bot.send_message(chat_id, "Cloning repo...")
         subprocess.run("rm -rf /root/rl-swarm", shell=True)
         result = subprocess.run("git clone https://github.com/shairkhan2/rl-swarm.git /root/rl-swarm", shell=True, capture_output=True, text=True)
@@ -487,6 +706,7 @@ def gensyn_hard_update(chat_id):
             if os.path.exists(src):
                 shutil.copy(src, dst)
         
+        set_progress("Restoring backup and starting Gensyn")
         time.sleep(1)  # Wait for file system sync
         
         # Verify no screen exists before starting
@@ -499,18 +719,87 @@ def gensyn_hard_update(chat_id):
     except Exception as e:
         bot.send_message(chat_id, f"Hard update failed: {str(e)}")
 
+def node_identity():
+    """
+    Who this node is, recorded in backup bundles
+    """
+    identity = {"host": os.uname().nodename}
+    try:
+        info = get_cached_peer_info()
+        if info:
+            identity["peer_name"] = info.get("peer_name")
+            identity["peer_id"] = info.get("peer_id")
+    except Exception:
+        pass
+    return identity
+
 def send_backup_files(chat_id):
-    files = [
-        SWARM_PEM_PATH,
-        USER_DATA_PATH,
-        USER_APIKEY_PATH
-    ]
-    for fpath in files:
-        if os.path.exists(fpath):
-            with open(fpath, "rb") as f:
-                bot.send_document(chat_id, f)
+    """
+    Send swarm.pem and the login files as one compressed, checksummed bundle
+    """
+    files = {}
+    missing = []
+    for name, path in BACKUP_BUNDLE_FILES.items():
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                files[name] = f.read()
         else:
-            bot.send_message(chat_id, f"{os.path.basename(fpath)} not found.")
+            missing.append(name)
+    if not files:
+        bot.send_message(chat_id, "❌ No backup files found.")
+        return
+    identity = node_identity()
+    bundle = build_bundle(files, identity)
+    caption = [f"🗂️ Backup: {', '.join(files)}"]
+    if identity.get("peer_name"):
+        caption.append(f"🧩 Peer: {identity['peer_name']}")
+    if missing:
+        caption.append(f"⚠️ Not found: {', '.join(missing)}")
+    caption.append("Send this file to the bot on any VPS to restore it.")
+    bot.send_document(
+        chat_id,
+        bundle,
+        visible_file_name=f"gensyn-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}{BUNDLE_SUFFIX}",
+        caption="\n".join(caption)
+    )
+
+def restore_backup_bundle(chat_id, data):
+    """
+    Verify an uploaded bundle and put all of its files in place in one step.
+    Nothing is written unless every checksum matches.
+    """
+    global waiting_for_pem
+    try:
+        manifest, files = read_bundle(data, BACKUP_BUNDLE_FILES)
+    except BundleError as e:
+        bot.send_message(chat_id, f"❌ Backup rejected: {str(e)}. Nothing was changed.")
+        return
+    # Current login files go to the backup history, so /backups can undo this
+    backup_user_data()
+    targets = {BACKUP_BUNDLE_FILES[name]: content for name, content in files.items()}
+    if "swarm.pem" in files and os.path.exists(SWARM_PEM_PATH):
+        with open(SWARM_PEM_PATH, "rb") as f:
+            current_pem = f.read()
+        if current_pem != files["swarm.pem"]:
+            # A different node key is kept once rather than lost
+            targets[f"{SWARM_PEM_PATH}.bak"] = current_pem
+    atomic_write_many(targets)
+
+    identity = manifest.get("identity") or {}
+    lines = [f"✅ Restored {', '.join(files)} (checksums verified)"]
+    if identity.get("peer_name"):
+        lines.append(f"🧩 Peer: {identity['peer_name']}")
+    if identity.get("host"):
+        lines.append(f"🖥️ From: {identity['host']} · {manifest.get('created', '?')}")
+    bot.send_message(chat_id, "\n".join(lines))
+    logging.info(f"Restored backup bundle: {', '.join(files)}")
+
+    if "swarm.pem" in files and waiting_for_pem:
+        waiting_for_pem = False
+        bot.send_message(chat_id, "Starting Gensyn...")
+        start_gensyn_session(chat_id, use_sync_backup=False)
+    elif check_gensyn_screen_running():
+        bot.send_message(chat_id, "ℹ️ Gensyn is running; restart it to use the restored files.")
 
 def check_gensyn_screen_running():
     """
@@ -518,40 +807,18 @@ def check_gensyn_screen_running():
     Returns True if running, False otherwise
     """
     try:
-        result = subprocess.run("screen -ls", shell=True, capture_output=True, text=True)
-        return "gensyn" in result.stdout
+        return find_screen_session("gensyn") is not None
     except Exception as e:
         logging.error(f"Error checking screen: {str(e)}")
         return False
 
-def get_screen_output(screen_name="gensyn", lines=20):
+def hardcopy_screen_output(screen_name="gensyn"):
     """
-    Capture the current visible screen output (not scrollback)
-    Returns the output as a string, or None if screen doesn't exist
+    One-off capture of the visible screen through `screen -X hardcopy`.
+    Only used until the streaming capture has received output.
     """
     try:
-        # Get list of screens and find the first matching one
-        result = subprocess.run("screen -ls", shell=True, capture_output=True, text=True)
-        
-        # Find the full screen identifier (PID.name)
-        screen_id = None
-        for line in result.stdout.split('\n'):
-            if f".{screen_name}" in line and "Detached" in line:
-                # Extract PID.name (e.g., "207207.gensyn")
-                parts = line.strip().split()
-                if parts:
-                    screen_id = parts[0]
-                    break
-        
-        # If no detached screen, try attached
-        if not screen_id:
-            for line in result.stdout.split('\n'):
-                if f".{screen_name}" in line and "Attached" in line:
-                    parts = line.strip().split()
-                    if parts:
-                        screen_id = parts[0]
-                        break
-        
+        screen_id = find_screen_session(screen_name)
         if not screen_id:
             return None
         
@@ -585,53 +852,33 @@ def get_screen_output(screen_name="gensyn", lines=20):
         logging.error(f"Error capturing screen output: {str(e)}")
         return None
 
+def get_screen_output(screen_name="gensyn", lines=20):
+    """
+    Return the last `lines` lines of the screen session's output, or None
+    if the screen doesn't exist. For the gensyn session this is a memory
+    read from the streaming capture.
+    """
+    try:
+        if screen_name == gensyn_capture.session_name:
+            output = gensyn_capture.snapshot(lines)
+            if output is not None:
+                return output
+        return hardcopy_screen_output(screen_name)
+    except Exception as e:
+        logging.error(f"Error capturing screen output: {str(e)}")
+        return None
+
 def create_screen_image(screen_name="gensyn"):
     """
-    Capture screen output and convert to an image
-    Returns path to image file, or None if failed
+    Capture screen output and render it as a PNG
+    Returns the PNG bytes, or None if failed
     """
     try:
-        from PIL import Image, ImageDraw, ImageFont
-        
         # Get screen output
         output = get_screen_output(screen_name, lines=50)
         if not output:
             return None
-        
-        # Image settings
-        font_size = 14
-        line_height = 18
-        padding = 20
-        bg_color = (0, 0, 0)  # Black background
-        text_color = (0, 255, 0)  # Green text (terminal style)
-        
-        # Try to use monospace font
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
-        
-        # Split into lines and calculate image size
-        lines = output.split('\n')
-        max_width = max(len(line) for line in lines) if lines else 80
-        img_width = max_width * (font_size - 4) + (padding * 2)
-        img_height = len(lines) * line_height + (padding * 2)
-        
-        # Create image
-        img = Image.new('RGB', (img_width, img_height), bg_color)
-        draw = ImageDraw.Draw(img)
-        
-        # Draw text
-        y = padding
-        for line in lines:
-            draw.text((padding, y), line, fill=text_color, font=font)
-            y += line_height
-        
-        # Save image
-        img_path = f"/tmp/{screen_name}_screenshot.png"
-        img.save(img_path)
-        
-        return img_path
+        return screen_renderer.render(output)
     except Exception as e:
         logging.error(f"Error creating screen image: {str(e)}")
         return None
@@ -642,6 +889,7 @@ def auto_restart_gensyn(chat_id):
     """
     try:
         bot.send_message(chat_id, "🔄 Auto-restarting Gensyn...")
+        set_progress("Running gensyn_launcher.sh")
         
         # Use the safe launcher script
         result = subprocess.run(
@@ -676,8 +924,7 @@ def start_gensyn_session(chat_id, use_sync_backup=True, fresh_start=False):
             for file in ["userData.json", "userApiKey.json"]:
                 backup_path = os.path.join(SYNC_BACKUP_DIR, file)
                 target_path = USER_DATA_PATH if file == "userData.json" else USER_APIKEY_PATH
-                if os.path.exists(backup_path):
-                    shutil.copy(backup_path, target_path)
+                if os.path.exists(backup_path) and copy_if_valid(backup_path, target_path):
                     backup_found = True
         commands = [
             "cd /root/rl-swarm",
@@ -710,8 +957,7 @@ def start_gensyn_session(chat_id, use_sync_backup=True, fresh_start=False):
             for file in ["userData.json", "userApiKey.json"]:
                 backup_path = os.path.join(SYNC_BACKUP_DIR, file)
                 target_path = USER_DATA_PATH if file == "userData.json" else USER_APIKEY_PATH
-                if os.path.exists(backup_path):
-                    shutil.copy(backup_path, target_path)
+                if os.path.exists(backup_path) and copy_if_valid(backup_path, target_path):
                     backup_found = True
         commands = [
             "cd /root/rl-swarm",
@@ -734,32 +980,26 @@ def get_gensyn_log_status(log_path=GENSYN_LOG_PATH):
         if not os.path.exists(log_path):
             return None
 
-        with open(log_path, "r") as f:
-            lines = f.readlines()[-50:]
+        lines = read_recent_log_lines(log_path, 50)
 
         latest_ts = None
         joining_round = None
         starting_round = None
 
         for line in reversed(lines):
-            if "] - " in line:
-                try:
-                    ts_str = line.split("]")[0][1:]
-                    ts = datetime.strptime(ts_str.split(",")[0], "%Y-%m-%d %H:%M:%S")
-                    msg = line.split("] - ", 1)[-1].strip()
-
-                    if not latest_ts:
-                        latest_ts = ts
-                    if "Joining round" in msg and not joining_round:
-                        joining_round = msg
-                    if "Starting round" in msg and not starting_round:
-                        starting_round = msg
-                    
-                    if latest_ts and joining_round and starting_round:
-                        break
-                except (ValueError, IndexError):
-                    continue
-        
+            parsed = classify_line(line)
+            if parsed is None:
+                continue
+            if not latest_ts:
+                latest_ts = datetime.utcfromtimestamp(int(parsed.ts))
+            if parsed.kind == JOIN and not joining_round:
+                joining_round = parsed.msg
+            if parsed.kind == START and not starting_round:
+                starting_round = parsed.msg
+
+            if latest_ts and joining_round and starting_round:
+                break
+
         return {
             "timestamp": latest_ts,
             "joining": joining_round,
@@ -769,94 +1009,115 @@ def get_gensyn_log_status(log_path=GENSYN_LOG_PATH):
         logging.error(f"Error reading Gensyn log: {str(e)}")
         return None
 
-def check_gensyn_api():
+def probe_localhost(timeout=5):
     """
-    Checks if the Gensyn API is online by making a request to localhost:3000
-    Returns True if online, False otherwise
+    One request to localhost:3000 feeding both status flags
+    Returns (api_alive, signin_page): whether the Gensyn service answers,
+    and whether it is showing the "Sign in to Gensyn" page
     """
     try:
-        response = requests.get("http://localhost:3000", timeout=5)
-        if response.status_code == 200:
-            # Check for various indicators that the Gensyn service is running
-            response_text = response.text.lower()
-            gensyn_indicators = [
-                "sign in to gensyn",
-                "gensyn",
-                "__next_error__",
-                "<!doctype html>",
-                "<html"
-            ]
-            
-            # If any of these indicators are found, the service is running
-            for indicator in gensyn_indicators:
-                if indicator in response_text:
-                    return True
-        return False
+        response = http_client.get("http://localhost:3000", timeout=timeout, retries=0)
     except Exception as e:
         logging.error(f"Error checking Gensyn API: {str(e)}")
-        return False
+        return False, False
+
+    signin_page = "Sign in to Gensyn" in response.text
+    if response.status_code == 200:
+        # Check for various indicators that the Gensyn service is running
+        response_text = response.text.lower()
+        gensyn_indicators = [
+            "sign in to gensyn",
+            "gensyn",
+            "__next_error__",
+            "<!doctype html>",
+            "<html"
+        ]
+
+        # If any of these indicators are found, the service is running
+        for indicator in gensyn_indicators:
+            if indicator in response_text:
+                return True, signin_page
+    return False, signin_page
+
+def check_gensyn_api():
+    """
+    Checks if the Gensyn API is online by making a request to localhost:3000
+    Returns True if online, False otherwise
+    """
+    return probe_localhost()[0]
+
+def fetch_peer_stats(peer_id):
+    id_url = f"https://dashboard.gensyn.ai/api/v1/peer?id={quote_plus(peer_id)}"
+    return dashboard_cache.get_json(id_url)
 
-def format_gensyn_status():
+def fetch_peer_eoa(peer_id):
+    return resolve_eoas(eoa_cache, EOA_CONTRACT_ADDRESS, [peer_id]).get(peer_id, "?")
+
+def format_gensyn_status(absolute_times=False):
     """
-    Formats the complete Gensyn status message, including peer info and EQA address
+    Formats the complete Gensyn status message, including peer info and EQA address.
+    With absolute_times the last activity and screen change are shown as
+    UTC clock times instead of "N minutes ago", so an unchanged node renders
+    the same text on every refresh (the live dashboard only edits on change)
     """
-    import glob
     import json
-    from urllib.parse import quote_plus
-    from web3 import Web3
-    from datetime import date
-
-    EOA_CACHE_FILE = "/root/gensyn-bot/eoa_cache.json"
-    ALCHEMY_RPC = "https://gensyn-testnet.g.alchemy.com/v2/TD5tr7mo4VfXlSaolFlSr3tL70br2M9J"
-    CONTRACT_ADDRESS = "0xFaD7C5e93f28257429569B854151A1B8DCD404c2"
-    ABI = [
-        {
-            "name": "getEoa",
-            "type": "function",
-            "stateMutability": "view",
-            "inputs": [{"name": "peerIds", "type": "string[]"}],
-            "outputs": [{"name": "", "type": "address[]"}]
-        }
-    ]
 
-    def fetch_eoa_mapping(w3, contract, peer_ids):
-        today = str(date.today())
-        if os.path.exists(EOA_CACHE_FILE):
-            try:
-                with open(EOA_CACHE_FILE) as f:
-                    data = json.load(f)
-                    if data.get("date") == today:
-                        return data.get("mapping", {})
-            except Exception:
-                pass
+    # Peer Discovery via cached JSON (from swarm_launcher.log)
+    peer_name = None
+    peer_id = None
+    try:
+        info = get_cached_peer_info()
+        if info:
+            peer_name = info.get("peer_name") or None
+            peer_id = info.get("peer_id") or None
+    except Exception:
+        peer_name = None
+        peer_id = None
+
+    peer_info_lines = []
+    # Prefer saved peer_id. If missing, resolve from peer_name, then fetch metrics by id.
+    resolved_peer_id = peer_id
+    resolved_peer_name = peer_name
+
+    # Resolve peer id from name if we don't have an id
+    if not resolved_peer_id and resolved_peer_name:
         try:
-            addresses = contract.functions.getEoa(peer_ids).call()
-            mapping = {pid: eoa for pid, eoa in zip(peer_ids, addresses)}
-            with open(EOA_CACHE_FILE, "w") as f:
-                json.dump({"date": today, "mapping": mapping}, f, indent=4)
-            return mapping
+            resolved_peer_id, resolved_peer_name = resolve_peer_id(resolved_peer_name)
+        except http_client.FetchError as e:
+            peer_info_lines.append(f"Peer name lookup failed: {e.status_code}")
         except Exception as e:
-            return {pid: f"Error: {str(e)}" for pid in peer_ids}
+            peer_info_lines.append(f"Peer name lookup error: {str(e)}")
+
+    # localhost:3000, the log, the dashboard and the contract are probed
+    # concurrently; whatever has not answered by the deadline shows as unknown
+    probes = {
+        "localhost": lambda: probe_localhost(timeout=3),
+        "log": get_gensyn_log_status,
+    }
+    if resolved_peer_id:
+        probes["stats"] = lambda: fetch_peer_stats(resolved_peer_id)
+        probes["eoa"] = lambda: fetch_peer_eoa(resolved_peer_id)
+    results, errors, late = gather(status_executor, probes, STATUS_PROBE_DEADLINE_SECONDS)
 
     # Check API status by making a request to localhost:3000
-    try:
-        response = requests.get("http://localhost:3000", timeout=3)
-        if "Sign in to Gensyn" in response.text:
-            api_status = "localhost:3000: ✅ Running"
-        else:
-            api_status = "localhost:3000: ❌ Stopped"
-    except Exception:
+    if "localhost" in late:
+        api_status = "localhost:3000: ⏳ No response"
+    elif results.get("localhost", (False, False))[1]:
+        api_status = "localhost:3000: ✅ Running"
+    else:
         api_status = "localhost:3000: ❌ Stopped"
 
     # Check log status and collect structured fields
-    log_data = get_gensyn_log_status()
+    log_data = results.get("log")
     log_status_lines = []
     last_activity_min = None
+    last_activity_at = None
     joining_round_num = None
     starting_round_str = None
     if log_data and any(log_data.values()):
         if log_data.get("timestamp"):
             ts = log_data["timestamp"]
+            last_activity_at = ts
             last_activity_min = int((datetime.utcnow() - ts).total_seconds() / 60)
             log_status_lines.append(f"🕰️ Last Activity: {last_activity_min} mins ago")
         if log_data.get("joining"):
@@ -871,80 +1132,71 @@ def format_gensyn_status():
             log_status_lines.append(f"▶️ Starting: Round {starting_round_str}")
     log_status = "\n".join(log_status_lines) if log_status_lines else "Round: No data found"
 
-    # Peer Discovery via cached JSON (from swarm_launcher.log)
-    peer_name = None
-    peer_id = None
-    try:
-        info = get_cached_peer_info()
-        if info:
-            peer_name = info.get("peer_name") or None
-            peer_id = info.get("peer_id") or None
-    except Exception:
-        peer_name = None
-        peer_id = None
-
-    peer_info_lines = []
-    # Prefer saved peer_id. If missing, resolve from peer_name, then fetch metrics by id.
-    resolved_peer_id = peer_id
-    resolved_peer_name = peer_name
-
-    # Resolve peer id from name if we don't have an id
-    if not resolved_peer_id and resolved_peer_name:
-        try:
-            name_url = f"https://dashboard.gensyn.ai/api/v1/peer?name={quote_plus(resolved_peer_name)}"
-            r = requests.get(name_url, timeout=10)
-            if r.status_code == 200:
-                name_data = r.json()
-                raw_peer_id = name_data.get("peerId") or ""
-                # Split composite id in format "wallet|ipfsPeerId"
-                resolved_peer_id = raw_peer_id.split("|")[-1] if "|" in raw_peer_id else raw_peer_id or None
-                resolved_peer_name = name_data.get("peerName") or resolved_peer_name
-            else:
-                peer_info_lines.append(f"Peer name lookup failed: {r.status_code}")
-        except Exception as e:
-            peer_info_lines.append(f"Peer name lookup error: {str(e)}")
+    # Rounds older than the recent lines come from the event store
+    if not joining_round_num:
+        event = swarm_events.latest(JOIN)
+        if event:
+            joining_round_num = str(event.round)
+    if not starting_round_str:
+        event = swarm_events.latest(START)
+        if event:
+            starting_round_str = str(event.round)
+    now_utc = datetime.utcnow()
+    rounds_today = swarm_events.rounds_completed_since(now_utc.replace(hour=0, minute=0, second=0, microsecond=0))
+    avg_round = swarm_events.average_round_duration(now_utc - timedelta(hours=24))
+    screen_idle = gensyn_freeze.frozen_for(now_utc)
+    screen_rate = gensyn_freeze.change_rate(now_utc - timedelta(hours=1))
 
     reward = "?"
     score = "?"
     online = False
 
-    # Fetch metrics by id if available
+    # Metrics by id if available
     if resolved_peer_id:
-        try:
-            id_url = f"https://dashboard.gensyn.ai/api/v1/peer?id={quote_plus(resolved_peer_id)}"
-            s = requests.get(id_url, timeout=10)
-            if s.status_code == 200:
-                stats = s.json()
-                reward = stats.get("reward", "?")
-                score = stats.get("score", "?")
-                online = stats.get("online", False)
-            else:
-                peer_info_lines.append(f"Peer id lookup failed: {s.status_code}")
-        except Exception as e:
-            peer_info_lines.append(f"Peer id lookup error: {str(e)}")
+        if "stats" in results:
+            stats = results["stats"]
+            reward = stats.get("reward", "?")
+            score = stats.get("score", "?")
+            online = stats.get("online", False)
+        elif "stats" in late:
+            peer_info_lines.append(f"Peer id lookup timed out after {STATUS_PROBE_DEADLINE_SECONDS}s")
+        elif isinstance(errors.get("stats"), http_client.FetchError):
+            peer_info_lines.append(f"Peer id lookup failed: {errors['stats'].status_code}")
+        else:
+            peer_info_lines.append(f"Peer id lookup error: {str(errors.get('stats'))}")
     else:
         if not resolved_peer_name:
             peer_info_lines.append("No peer id or name found.")
 
-    # Get EQA address from smart contract using the resolved peer id
-    w3 = Web3(Web3.HTTPProvider(ALCHEMY_RPC))
-    contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=ABI)
+    # EQA address from smart contract using the resolved peer id
     eqa = "?"
     if resolved_peer_id:
-        try:
-            eoa_mapping = fetch_eoa_mapping(w3, contract, [resolved_peer_id])
-            eqa = eoa_mapping.get(resolved_peer_id, "?")
-        except Exception as e:
-            eqa = f"Error: {str(e)}"
+        if "eoa" in results:
+            eqa = results["eoa"]
+        elif "eoa" in errors:
+            eqa = f"Error: {str(errors['eoa'])}"
 
     # Pretty emoji-format status block
     status_label = "✅ Running" if "✅" in api_status else "❌ Stopped"
-    last_txt = f"{last_activity_min}m" if last_activity_min is not None else "—"
+    if last_activity_min is None:
+        last_txt = "—"
+    elif absolute_times:
+        last_txt = last_activity_at.strftime("%H:%M UTC")
+    else:
+        last_txt = f"{last_activity_min}m"
+    if screen_idle is None:
+        screen_txt = "—"
+    elif absolute_times:
+        screen_txt = f"changed {gensyn_freeze.last_change.strftime('%H:%M UTC')}"
+    else:
+        screen_txt = f"changed {int(screen_idle.total_seconds() // 60)}m ago"
     join_txt = joining_round_num or "—"
     start_txt = starting_round_str or "—"
     pretty_lines = [
         f"🌐 Status → {status_label} ({last_txt})",
         f"🐝 Round → {join_txt} | {start_txt}",
+        f"⏱️ Today → {rounds_today} rounds    Avg(24h) → {f'{avg_round / 60:.1f}m' if avg_round else '—'}",
+        f"📺 Screen → {screen_txt}    Active(1h) → {f'{screen_rate:.0%}' if screen_rate is not None else '—'}",
         f"🎁 Reward → {reward}    🏆 Win → {score}",
         f"🧩 Peer → {resolved_peer_name or '—'}",
         f"🆔 ID → {resolved_peer_id or '—'}",
@@ -954,8 +1206,6 @@ def format_gensyn_status():
     # Wrap in HTML <pre> for tap-to-copy in Telegram
     return f"<pre>{html.escape(text)}</pre>"
 
-    return f"{api_status}\n\n{log_status}\n" + "\n".join(peer_info_lines)
-
 @bot.message_handler(commands=['start'])
 def start_handler(message):
     if message.from_user.id == USER_ID:
@@ -966,6 +1216,158 @@ def who_handler(message):
     if message.from_user.id == USER_ID:
         bot.send_message(message.chat.id, f"👤 This is your VPN Bot")
 
+@bot.message_handler(commands=['net'])
+def net_handler(message):
+    if message.from_user.id != USER_ID:
+        return
+    lines = []
+    for host, stats in http_client.host_stats().items():
+        lines.append(
+            f"{host}\n"
+            f"  req {stats['requests']}  err {stats['errors']}  retry {stats['retries']}\n"
+            f"  conn new {stats['connections_opened']}  reused {stats['connections_reused']}\n"
+            f"  latency avg {stats['latency_avg'] * 1000:.0f}ms  max {stats['latency_max'] * 1000:.0f}ms"
+        )
+    lines.append(
+        f"alerts\n"
+        f"  sent {outbox.sent}  merged {outbox.merged}  queued {outbox.pending()}\n"
+        f"  429 {outbox.rate_limited}  dropped {outbox.dropped}"
+    )
+    text = "\n".join(lines)
+    bot.send_message(message.chat.id, f"<pre>{html.escape(text)}</pre>", parse_mode="HTML")
+
+@bot.message_handler(commands=['scrollback'])
+def scrollback_handler(message):
+    if message.from_user.id != USER_ID:
+        return
+    if gensyn_capture.refresh() is None:
+        bot.send_message(message.chat.id, "⚠️ Gensyn screen not running")
+        return
+    lines = gensyn_capture.lines()
+    if not lines:
+        bot.send_message(message.chat.id, "No screen output captured yet.")
+        return
+    bot.send_document(
+        message.chat.id,
+        "\n".join(lines).encode("utf-8"),
+        visible_file_name="gensyn_scrollback.txt",
+        caption=f"📜 Last {len(lines)} lines of the gensyn screen"
+    )
+
+def submit_job(chat_id, kind, func, label, group="gensyn"):
+    """
+    Queue func(chat_id) on the job executor, telling the user if the same
+    action is already queued or running, or if it has to wait for another job
+    """
+    job, created = job_executor.submit(kind, func, chat_id, label=label, group=group)
+    if not created:
+        bot.send_message(chat_id, f"⚠️ {job.label} is already {job.state} (job #{job.id}). See /jobs")
+        return job
+    ahead = job_executor.waiting_on(job)
+    if ahead is not None:
+        logging.error(f"{job.label} (job #{job.id}) queued behind job #{ahead.id} {ahead.label}")
+        bot.send_message(chat_id, f"⏳ {job.label} queued behind job #{ahead.id} {ahead.label}. See /jobs")
+    return job
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m {seconds}s" if minutes else f"{seconds}s"
+
+@bot.message_handler(commands=['jobs'])
+def jobs_handler(message):
+    if message.from_user.id != USER_ID:
+        return
+    active, recent = job_executor.snapshot()
+    now = time.time()
+    lines = []
+    markup = InlineKeyboardMarkup()
+    for job in active:
+        if job.state == RUNNING:
+            progress = f" — {job.progress}" if job.progress else ""
+            lines.append(f"▶️ #{job.id} {job.label} · {format_duration(job.elapsed(now))}{progress}")
+        else:
+            lines.append(f"⏳ #{job.id} {job.label} · queued {format_duration(job.elapsed(now))}")
+        markup.add(InlineKeyboardButton(f"🛑 Cancel #{job.id} {job.label}", callback_data=f"cancel_job:{job.id}"))
+    if not active:
+        lines.append("No jobs running or queued.")
+    if recent:
+        icons = {"done": "✅", "failed": "❌", "cancelled": "🛑"}
+        lines.append("")
+        lines.append("Recent:")
+        for job in recent[:5]:
+            lines.append(f"{icons.get(job.state, '•')} #{job.id} {job.label} · {format_duration(job.elapsed())}")
+    bot.send_message(message.chat.id, "\n".join(lines), reply_markup=markup if active else None)
+
+def render_screen_snapshot():
+    """
+    Screenshot for the status view: (png bytes or None, caption)
+    """
+    if not check_gensyn_screen_running():
+        return None, "⚠️ Gensyn screen not running"
+    photo = create_screen_image("gensyn")
+    if photo:
+        return photo, "📺 Gensyn Screen Output"
+    return None, "⚠️ Could not capture screen output"
+
+def refresh_live_status(chat_id):
+    """
+    Re-render the chat's live dashboard; Telegram is only called for parts that changed
+    """
+    photo, caption = render_screen_snapshot()
+    return live_status.show(chat_id, format_gensyn_status(absolute_times=True), get_menu(), photo, caption)
+
+def live_status_job():
+    for chat_id in live_status.live_chats():
+        try:
+            refresh_live_status(chat_id)
+        except Exception as e:
+            logging.error(f"Live status refresh failed for {chat_id}: {str(e)}")
+
+def show_live_status(chat_id):
+    """
+    Status tap in live mode: the pinned dashboard is the answer. It is only
+    re-rendered if the periodic refresh has not run recently
+    """
+    age = live_status.age(chat_id)
+    if age is None or age > LIVE_STATUS_SECONDS:
+        refresh_live_status(chat_id)
+
+@bot.message_handler(commands=['backups'])
+def backups_handler(message):
+    if message.from_user.id != USER_ID:
+        return
+    snapshots = backup_store.list()
+    if not snapshots:
+        bot.send_message(message.chat.id, "No login backups yet.")
+        return
+    lines = [f"🗄️ {len(snapshots)} login backups (newest first):"]
+    markup = InlineKeyboardMarkup()
+    for snapshot in snapshots[:10]:
+        taken = datetime.fromtimestamp(snapshot["time"]).strftime("%Y-%m-%d %H:%M")
+        lines.append(f"• {taken}  {', '.join(sorted(snapshot['files']))}")
+        markup.add(InlineKeyboardButton(f"♻️ Restore {taken}", callback_data=f"restore_snapshot:{snapshot['id']}"))
+    bot.send_message(message.chat.id, "\n".join(lines), reply_markup=markup)
+
+@bot.message_handler(commands=['live'])
+def live_handler(message):
+    if message.from_user.id != USER_ID:
+        return
+    chat_id = message.chat.id
+    if live_status.is_live(chat_id):
+        live_status.set_live(chat_id, False)
+        bot.send_message(chat_id, "📴 Live status off. Status taps send a new message again.")
+        return
+    live_status.set_live(chat_id, True)
+    try:
+        refresh_live_status(chat_id)
+        bot.send_message(chat_id, f"📌 Live status on. The pinned message updates every {LIVE_STATUS_SECONDS}s when something changes; /live again to stop.")
+    except Exception as e:
+        logging.error(f"Error starting live status: {str(e)}")
+        bot.send_message(chat_id, "❌ Error getting status. Check logs.")
+
 @bot.message_handler(func=lambda message: message.from_user.id == USER_ID)
 def handle_credentials(message):
     global login_in_progress
@@ -989,24 +1391,22 @@ def gensyn_status_handler(message):
     if message.from_user.id != USER_ID:
         return
     try:
+        if live_status.is_live(message.chat.id):
+            show_live_status(message.chat.id)
+            return
         status_message = format_gensyn_status()
         status_msg = bot.send_message(message.chat.id, status_message, parse_mode="HTML")
         
         # Send screen output screenshot as image (reply to status message)
         if check_gensyn_screen_running():
-            img_path = create_screen_image("gensyn")
-            if img_path and os.path.exists(img_path):
-                with open(img_path, 'rb') as photo:
-                    bot.send_photo(
-                        message.chat.id, 
-                        photo, 
-                        caption="📺 Gensyn Screen Output",
-                        reply_to_message_id=status_msg.message_id
-                    )
-                try:
-                    os.remove(img_path)
-                except:
-                    pass
+            photo = create_screen_image("gensyn")
+            if photo:
+                bot.send_photo(
+                    message.chat.id,
+                    photo,
+                    caption="📺 Gensyn Screen Output",
+                    reply_to_message_id=status_msg.message_id
+                )
             else:
                 bot.send_message(message.chat.id, "⚠️ Could not capture screen output", reply_to_message_id=status_msg.message_id)
         else:
@@ -1015,6 +1415,21 @@ def gensyn_status_handler(message):
         logging.error(f"Error in gensyn_status_handler: {str(e)}")
         bot.send_message(message.chat.id, "❌ Error getting status. Check logs.")
 
+def allow_action(call):
+    """
+    Only the owner may press buttons, and at most once per COOLDOWN_SECONDS
+    """
+    user_id = call.from_user.id
+    now = time.time()
+
+    if user_id != USER_ID:
+        return False
+
+    if user_id in last_action_time and (now - last_action_time[user_id]) < COOLDOWN_SECONDS:
+        return False
+    last_action_time[user_id] = now
+    return True
+
 @bot.callback_query_handler(func=lambda call: True)
 def callback_query(call):
     global waiting_for_pem
@@ -1022,30 +1437,13 @@ def callback_query(call):
     global tmate_running
     global last_action_time
     global monitor_active
-    global monitor_thread
-    # Ensure globals are initialized
-    try:
-        monitor_active
-    except NameError:
-        monitor_active = False
-    try:
-        monitor_thread
-    except NameError:
-        monitor_thread = None
-    user_id = call.from_user.id
-    now = time.time()
-    
-    if user_id != USER_ID:
-        return
-        
-    if user_id in last_action_time and (now - last_action_time[user_id]) < COOLDOWN_SECONDS:
+    if not allow_action(call):
         return
-    last_action_time[user_id] = now
 
     try:
         if call.data == 'check_ip':
             try:
-                ip = requests.get('https://api.ipify.org', timeout=10).text.strip()
+                ip = http_client.get('https://api.ipify.org', timeout=10).text.strip()
                 bot.send_message(call.message.chat.id, f"🌐 Current Public IP: {ip}")
             except Exception as e:
                 bot.send_message(call.message.chat.id, f"❌ Error checking IP: {str(e)}")
@@ -1074,7 +1472,7 @@ def callback_query(call):
                             stderr=subprocess.STDOUT,
                             env={**os.environ, "PYTHONPATH": venv_site_packages}
                         )
-                    threading.Thread(target=check_login_timeout, args=(call.message.chat.id,)).start()
+                    scheduler.run_once("login_timeout", check_login_timeout, LOGIN_TIMEOUT_SECONDS, args=(call.message.chat.id,))
                 except Exception as e:
                     login_in_progress = False
                     bot.send_message(call.message.chat.id, f"❌ Error starting login: {str(e)}")
@@ -1089,25 +1487,27 @@ def callback_query(call):
             
         elif call.data == 'gensyn_status':
             try:
+                if live_status.is_live(call.message.chat.id):
+                    show_live_status(call.message.chat.id)
+                    try:
+                        bot.answer_callback_query(call.id, "📌 Live status is pinned above")
+                    except Exception:
+                        pass
+                    return
                 status_message = format_gensyn_status()
                 markup = get_menu()
                 status_msg = bot.send_message(call.message.chat.id, status_message, parse_mode="HTML", reply_markup=markup)
                 
                 # Send screen output screenshot as image (reply to status message)
                 if check_gensyn_screen_running():
-                    img_path = create_screen_image("gensyn")
-                    if img_path and os.path.exists(img_path):
-                        with open(img_path, 'rb') as photo:
-                            bot.send_photo(
-                                call.message.chat.id, 
-                                photo, 
-                                caption="📺 Gensyn Screen Output",
-                                reply_to_message_id=status_msg.message_id
-                            )
-                        try:
-                            os.remove(img_path)
-                        except:
-                            pass
+                    photo = create_screen_image("gensyn")
+                    if photo:
+                        bot.send_photo(
+                            call.message.chat.id,
+                            photo,
+                            caption="📺 Gensyn Screen Output",
+                            reply_to_message_id=status_msg.message_id
+                        )
                     else:
                         bot.send_message(call.message.chat.id, "⚠️ Could not capture screen output", reply_to_message_id=status_msg.message_id)
                 else:
@@ -1120,9 +1520,8 @@ def callback_query(call):
             try:
                 if not monitor_active:
                     monitor_active = True
-                    if monitor_thread is None or not monitor_thread.is_alive():
-                        monitor_thread = threading.Thread(target=reward_win_monitor, args=(call.message.chat.id,), daemon=True)
-                        monitor_thread.start()
+                    reward_monitor_state.update(chat_id=call.message.chat.id, last_reward=None, last_win=None)
+                    scheduler.add("reward_poll", reward_win_poll, REWARD_POLL_SECONDS, delay=0)
                     bot.send_message(call.message.chat.id, "🎯 Monitor started.")
                 else:
                     bot.send_message(call.message.chat.id, "Monitor already running.")
@@ -1133,25 +1532,14 @@ def callback_query(call):
         elif call.data == 'stop_monitor':
             try:
                 monitor_active = False
+                scheduler.remove("reward_poll")
                 bot.send_message(call.message.chat.id, "⏹️ Monitor stopped.")
             except Exception as e:
                 logging.error(f"Monitor stop error: {str(e)}")
                 bot.send_message(call.message.chat.id, f"❌ Failed to stop monitor: {str(e)}")
                 
         elif call.data == 'start_gensyn':
-            backup_exists = (
-                os.path.exists(os.path.join(SYNC_BACKUP_DIR, "userData.json")) and
-                os.path.exists(os.path.join(SYNC_BACKUP_DIR, "userApiKey.json"))
-            )
-            if backup_exists:
-                markup = InlineKeyboardMarkup()
-                markup.add(
-                    InlineKeyboardButton("Run with Login Backup", callback_data="start_gensyn_with_backup"),
-                    InlineKeyboardButton("Run Without Login Backup", callback_data="start_gensyn_no_backup")
-                )
-                bot.send_message(call.message.chat.id, "Login backup found. How do you want to start?", reply_markup=markup)
-            else:
-                start_gensyn_session(call.message.chat.id, use_sync_backup=False)
+            start_gensyn_choice(call.message.chat.id)
                 
         elif call.data == 'start_gensyn_with_backup':
             start_gensyn_session(call.message.chat.id, use_sync_backup=True)
@@ -1178,7 +1566,7 @@ def callback_query(call):
         
         elif call.data == 'install_gensyn':
             try:
-                threading.Thread(target=install_gensyn, args=(call.message.chat.id,), daemon=True).start()
+                submit_job(call.message.chat.id, "install", install_gensyn, "Install Gensyn")
             except Exception as e:
                 bot.send_message(call.message.chat.id, f"❌ Failed to start install: {str(e)}")
                 
@@ -1228,10 +1616,10 @@ def callback_query(call):
             bot.send_message(call.message.chat.id, "Choose update type:", reply_markup=markup)
             
         elif call.data == "gensyn_soft_update":
-            threading.Thread(target=gensyn_soft_update, args=(call.message.chat.id,), daemon=True).start()
+            submit_job(call.message.chat.id, "soft_update", gensyn_soft_update, "Soft update")
             
         elif call.data == "gensyn_hard_update":
-            threading.Thread(target=gensyn_hard_update, args=(call.message.chat.id,), daemon=True).start()
+            submit_job(call.message.chat.id, "hard_update", gensyn_hard_update, "Hard update")
             
         elif call.data == "bot_update":
             try:
@@ -1248,35 +1636,46 @@ def callback_query(call):
             send_backup_files(call.message.chat.id)
             
         elif call.data == "restore_backup":
-            threading.Thread(target=restore_from_telegram_backup, args=(call.message.chat.id,), daemon=True).start()
+            submit_job(call.message.chat.id, "restore", restore_from_telegram_backup, "Restore backup", group="restore")
             
         elif call.data == "manual_restart_gensyn":
             global auto_restart_scheduled
             auto_restart_scheduled = False
-            threading.Thread(target=auto_restart_gensyn, args=(call.message.chat.id,), daemon=True).start()
+            submit_job(call.message.chat.id, "restart", auto_restart_gensyn, "Restart Gensyn")
             
         elif call.data == "wandb_send_log":
-            try:
-                # Find the most recent log file
-                latest_log = None
-                if os.path.exists(WANDB_LOG_DIR):
-                    for root, dirs, files in os.walk(WANDB_LOG_DIR):
-                        for file in files:
-                            if file.endswith('.log'):
-                                file_path = os.path.join(root, file)
-                                if not latest_log or os.path.getmtime(file_path) > os.path.getmtime(latest_log):
-                                    latest_log = file_path
-                
-                if latest_log and os.path.exists(latest_log):
-                    with open(latest_log, "rb") as f:
-                        bot.send_document(call.message.chat.id, f)
-                else:
-                    bot.send_message(call.message.chat.id, "No log file found.")
-            except Exception as e:
-                bot.send_message(call.message.chat.id, f"Error sending log: {str(e)}")
+            send_wandb_log(call.message.chat.id, wandb_index.latest_log())
+
+        elif call.data == "wandb_runs":
+            runs = [(name, log_path) for name, log_path in wandb_index.recent(WANDB_RECENT_RUNS) if log_path]
+            if not runs:
+                bot.send_message(call.message.chat.id, "No log file found.")
+            else:
+                markup = InlineKeyboardMarkup()
+                for name, _ in runs:
+                    # callback_data is limited to 64 bytes
+                    if len(f"wandb_log:{name}".encode()) <= 64:
+                        markup.add(InlineKeyboardButton(f"📄 {name}", callback_data=f"wandb_log:{name}"))
+                bot.send_message(call.message.chat.id, "Which run's log?", reply_markup=markup)
+
+        elif call.data.startswith("restore_snapshot:"):
+            restore_snapshot(call.message.chat.id, call.data.split(":", 1)[1])
+
+        elif call.data.startswith("wandb_log:"):
+            # Only runs in the index can be picked, so the name never becomes an arbitrary path
+            send_wandb_log(call.message.chat.id, wandb_index.log_for(call.data.split(":", 1)[1]))
                 
         elif call.data == "wandb_skip_log":
             bot.send_message(call.message.chat.id, "Log skipped.")
+
+        elif call.data.startswith("cancel_job:"):
+            job = job_executor.cancel(int(call.data.split(":", 1)[1]))
+            if job is None:
+                bot.send_message(call.message.chat.id, "ℹ️ That job already finished.")
+            elif job.state == RUNNING:
+                bot.send_message(call.message.chat.id, f"🛑 Asked #{job.id} {job.label} to stop at its next safe point.")
+            else:
+                bot.send_message(call.message.chat.id, f"🛑 #{job.id} {job.label} cancelled.")
             
     except Exception as e:
         logging.error(f"Error in callback_query: {str(e)}")
@@ -1288,14 +1687,22 @@ def handle_document(message):
     if message.from_user.id != USER_ID:
         return
     
-    file_name = message.document.file_name
+    file_name = message.document.file_name or ""
     
-    # Auto-save backup files
-    backup_files = {
-        "swarm.pem": SWARM_PEM_PATH,
-        "userData.json": USER_DATA_PATH,
-        "userApiKey.json": USER_APIKEY_PATH
-    }
+    # Backup bundle from "Get Backup": verified, then restored in one step
+    if file_name.endswith(BUNDLE_SUFFIX):
+        if (message.document.file_size or 0) > MAX_BUNDLE_BYTES:
+            bot.send_message(message.chat.id, "❌ Backup rejected: file is too large. Nothing was changed.")
+            return
+        try:
+            file_info = bot.get_file(message.document.file_id)
+            restore_backup_bundle(message.chat.id, bot.download_file(file_info.file_path))
+        except Exception as e:
+            bot.send_message(message.chat.id, f"❌ Error restoring backup: {str(e)}")
+        return
+
+    # Single backup files (older backups) are still accepted
+    backup_files = BACKUP_BUNDLE_FILES
     
     if file_name in backup_files:
         try:
@@ -1303,8 +1710,7 @@ def handle_document(message):
             file_data = bot.download_file(file_info.file_path)
             target_path = backup_files[file_name]
             os.makedirs(os.path.dirname(target_path), exist_ok=True)
-            with open(target_path, 'wb') as f:
-                f.write(file_data)
+            atomic_write(target_path, file_data)
             bot.send_message(message.chat.id, f"✅ {file_name} saved successfully!")
             logging.info(f"Auto-saved backup file: {file_name}")
             
@@ -1324,8 +1730,7 @@ def handle_document(message):
             file_info = bot.get_file(message.document.file_id)
             file_data = bot.download_file(file_info.file_path)
             os.makedirs(os.path.dirname(SWARM_PEM_PATH), exist_ok=True)
-            with open(SWARM_PEM_PATH, 'wb') as f:
-                f.write(file_data)
+            atomic_write(SWARM_PEM_PATH, file_data)
             waiting_for_pem = False
             bot.send_message(message.chat.id, "✅ swarm.pem saved! Starting Gensyn...")
             start_gensyn_session(message.chat.id, use_sync_backup=False)
@@ -1335,203 +1740,211 @@ def handle_document(message):
 
 def check_login_timeout(chat_id):
     global login_in_progress
-    time.sleep(300)
     if login_in_progress:
         login_in_progress = False
-        bot.send_message(chat_id, "⏰ Login timed out. Please try again.")
+        send_alert("⏰ Login timed out. Please try again.", chat_id=chat_id)
+
+# State the monitor checks carry between runs
+monitor_state = {
+    "previous_ip": '',
+    "previous_alive": None,
+    "previous_localhost_alive": None,
+    "last_stale_sent_ts": None,
+    "last_screen_missing_alert": None,  # Prevent spam when screen missing
+}
+
+def schedule_auto_restart(message):
+    """
+    Announce and schedule an auto-restart AUTO_RESTART_DELAY_MINUTES from now
+    """
+    global auto_restart_scheduled
+    auto_restart_scheduled = True
+    send_alert(message)
+    scheduler.run_once("auto_restart", run_scheduled_restart, AUTO_RESTART_DELAY_MINUTES * 60)
 
-def monitor():
+def run_scheduled_restart():
     global auto_restart_scheduled
-    global auto_start_enabled
-    previous_ip = ''
-    previous_alive = None
-    wandb_file_cache = set()
-    wandb_folder_cache = set()
-    last_stale_sent_ts = None
-    previous_localhost_alive = None
-    restart_countdown = None
-    
-    # Screen output monitoring variables
-    previous_screen_output = None
-    screen_frozen_since = None
-    screen_check_counter = 0  # Check every 5 cycles (5 minutes)
-    last_screen_missing_alert = None  # Prevent spam when screen missing
+    auto_restart_scheduled = False
+    submit_job(USER_ID, "restart", auto_restart_gensyn, "Restart Gensyn")
 
+def cancel_auto_restart():
+    global auto_restart_scheduled
+    auto_restart_scheduled = False
+    scheduler.remove("auto_restart")
 
-    while True:
-        try:
-            # 1. API status (using check_gensyn_api)
-            alive = check_gensyn_api()
+def check_api_job():
+    """
+    API status and localhost:3000 status, from a single probe
+    """
+    alive, localhost_alive = probe_localhost()
 
-            # 1a. Localhost:3000 status (direct monitoring)
-            try:
-                response = requests.get("http://localhost:3000", timeout=3)
-                localhost_alive = "Sign in to Gensyn" in response.text
-            except Exception:
-                localhost_alive = False
+    previous_localhost_alive = monitor_state["previous_localhost_alive"]
+    if previous_localhost_alive is not None and localhost_alive != previous_localhost_alive:
+        status = '✅ Online' if localhost_alive else '❌ Offline'
+        send_alert(f"⚠️ localhost:3000 status changed: {status}")
+    monitor_state["previous_localhost_alive"] = localhost_alive
 
-            if previous_localhost_alive is not None and localhost_alive != previous_localhost_alive:
-                status = '✅ Online' if localhost_alive else '❌ Offline'
-                bot.send_message(USER_ID, f"⚠️ localhost:3000 status changed: {status}")
-            previous_localhost_alive = localhost_alive
+    previous_alive = monitor_state["previous_alive"]
+    if previous_alive is not None and alive != previous_alive:
+        status = '✅ Online' if alive else '❌ Offline'
+        send_alert(f"⚠️ API status changed: {status}")
+    monitor_state["previous_alive"] = alive
 
-            # 2. IP change
-            try:
-                ip = requests.get('https://api.ipify.org', timeout=10).text.strip()
-            except:
-                ip = "Unknown"
-
-            if ip and ip != previous_ip:
-                bot.send_message(USER_ID, f"⚠️ IP changed: {ip}")
-                previous_ip = ip
-
-            if previous_alive is not None and alive != previous_alive:
-                status = '✅ Online' if alive else '❌ Offline'
-                bot.send_message(USER_ID, f"⚠️ API status changed: {status}")
-            previous_alive = alive
-
-            # 3. Log freshness with auto-restart
-            log_data = get_gensyn_log_status()
-            if log_data and log_data.get("timestamp"):
-                latest_ts = log_data["timestamp"]
-                if (datetime.utcnow() - latest_ts > timedelta(minutes=120)):
-                    if not last_stale_sent_ts or last_stale_sent_ts != latest_ts:
-                        if auto_start_enabled:
-                            # Auto-start enabled: schedule auto-restart in 5 minutes
-                            if not auto_restart_scheduled:
-                                auto_restart_scheduled = True
-                                restart_countdown = 5
-                                bot.send_message(
-                                    USER_ID,
-                                    f"❗ Gensyn logs stuck for 2h! Auto-restarting in {restart_countdown} minutes..."
-                                )
-                                last_stale_sent_ts = latest_ts
-                        else:
-                            # Auto-start disabled: send manual restart button
-                            markup = InlineKeyboardMarkup()
-                            markup.add(InlineKeyboardButton("🔄 Restart", callback_data="manual_restart_gensyn"))
-                            bot.send_message(
-                                USER_ID,
-                                f"❗ Gensyn logs stuck for 2h! For restarting click below:",
-                                reply_markup=markup
-                            )
-                            last_stale_sent_ts = latest_ts
-                else:
-                    last_stale_sent_ts = None
-                    auto_restart_scheduled = False
-                    restart_countdown = None
-            
-            # Handle auto-restart countdown
-            if auto_restart_scheduled and restart_countdown is not None:
-                restart_countdown -= 1
-                if restart_countdown <= 0:
-                    auto_restart_scheduled = False
-                    threading.Thread(target=auto_restart_gensyn, args=(USER_ID,), daemon=True).start()
-                    restart_countdown = None
-            
-            # 3b. Screen output monitoring (frozen process detection)
-            screen_check_counter += 1
-            if screen_check_counter >= 5:  # Check every 5 minutes (5 * 60s cycles)
-                screen_check_counter = 0
-                
-                if check_gensyn_screen_running():
-                    current_output = get_screen_output("gensyn", 20)
-                    
-                    if current_output is not None:
-                        if previous_screen_output is not None:
-                            # Compare current output with previous
-                            if current_output == previous_screen_output:
-                                # Output hasn't changed
-                                if screen_frozen_since is None:
-                                    screen_frozen_since = datetime.utcnow()
-                                else:
-                                    # Check how long it's been frozen
-                                    frozen_duration = datetime.utcnow() - screen_frozen_since
-                                    if frozen_duration > timedelta(minutes=30):
-                                        # Frozen for 30+ minutes, trigger restart
-                                        if not auto_restart_scheduled:
-                                            if auto_start_enabled:
-                                                auto_restart_scheduled = True
-                                                restart_countdown = 5
-                                                bot.send_message(
-                                                    USER_ID,
-                                                    f"❗ Gensyn process frozen for 30min! Auto-restarting in {restart_countdown} minutes..."
-                                                )
-                                            else:
-                                                markup = InlineKeyboardMarkup()
-                                                markup.add(InlineKeyboardButton("🔄 Restart", callback_data="manual_restart_gensyn"))
-                                                bot.send_message(
-                                                    USER_ID,
-                                                    f"❗ Gensyn process frozen for 30min! For restarting click below:",
-                                                    reply_markup=markup
-                                                )
-                                            screen_frozen_since = None  # Reset to avoid spam
-                            else:
-                                # Output changed, reset frozen timer
-                                screen_frozen_since = None
-                        
-                        previous_screen_output = current_output
+def check_ip_job():
+    """
+    IP change
+    """
+    try:
+        ip = http_client.get('https://api.ipify.org', timeout=10).text.strip()
+    except:
+        ip = "Unknown"
+
+    if ip and ip != monitor_state["previous_ip"]:
+        send_alert(f"⚠️ IP changed: {ip}")
+        monitor_state["previous_ip"] = ip
+
+def log_freshness_job():
+    """
+    Log freshness with auto-restart
+    """
+    log_data = get_gensyn_log_status()
+    if log_data and log_data.get("timestamp"):
+        latest_ts = log_data["timestamp"]
+        if (datetime.utcnow() - latest_ts > timedelta(minutes=120)):
+            last_stale_sent_ts = monitor_state["last_stale_sent_ts"]
+            if not last_stale_sent_ts or last_stale_sent_ts != latest_ts:
+                if auto_start_enabled:
+                    # Auto-start enabled: schedule auto-restart in 5 minutes
+                    if not auto_restart_scheduled:
+                        schedule_auto_restart(
+                            f"❗ Gensyn logs stuck for 2h! Auto-restarting in {AUTO_RESTART_DELAY_MINUTES} minutes..."
+                        )
+                        monitor_state["last_stale_sent_ts"] = latest_ts
                 else:
-                    # Screen not running - check if it crashed
-                    now = datetime.utcnow()
-                    # Only alert once every 10 minutes to prevent spam
-                    should_alert = (last_screen_missing_alert is None or 
-                                   (now - last_screen_missing_alert) > timedelta(minutes=10))
-                    
-                    if should_alert:
-                        if auto_start_enabled and not auto_restart_scheduled:
-                            # Auto-start enabled: restart immediately
-                            auto_restart_scheduled = True
-                            last_screen_missing_alert = now
-                            bot.send_message(
-                                USER_ID,
-                                "❗ Gensyn screen missing (crashed)! Auto-restarting with backup..."
-                            )
-                            threading.Thread(target=auto_restart_gensyn, args=(USER_ID,), daemon=True).start()
-                        else:
-                            # Auto-start disabled: send manual restart button
-                            last_screen_missing_alert = now
-                            markup = InlineKeyboardMarkup()
-                            markup.add(InlineKeyboardButton("🔄 Restart", callback_data="manual_restart_gensyn"))
-                            bot.send_message(
-                                USER_ID,
-                                "❗ Gensyn screen missing (crashed)! For restarting click below:",
-                                reply_markup=markup
-                            )
-                    
-                    # Reset monitoring
-                    previous_screen_output = None
-                    screen_frozen_since = None
-
-            # 4. WANDB monitoring - simplified
-            new_folders = []
-            new_files = []
-            if os.path.exists(WANDB_LOG_DIR):
-                for root, dirs, files in os.walk(WANDB_LOG_DIR):
-                    for d in dirs:
-                        folder_path = os.path.join(root, d)
-                        if folder_path not in wandb_folder_cache:
-                            wandb_folder_cache.add(folder_path)
-                            new_folders.append(folder_path)
-                    for name in files:
-                        path = os.path.join(root, name)
-                        if path not in wandb_file_cache:
-                            wandb_file_cache.add(path)
-                            new_files.append(path)
-
-                if new_folders or new_files:
+                    # Auto-start disabled: send manual restart button
                     markup = InlineKeyboardMarkup()
-                    markup.add(
-                        InlineKeyboardButton("Yes", callback_data="wandb_send_log"),
-                        InlineKeyboardButton("No", callback_data="wandb_skip_log")
+                    markup.add(InlineKeyboardButton("🔄 Restart", callback_data="manual_restart_gensyn"))
+                    send_alert(
+                        f"❗ Gensyn logs stuck for 2h! For restarting click below:",
+                        reply_markup=markup
                     )
-                    bot.send_message(USER_ID, "🪄 WANDB detected. Want log file?", reply_markup=markup)
+                    monitor_state["last_stale_sent_ts"] = latest_ts
+        else:
+            monitor_state["last_stale_sent_ts"] = None
+            cancel_auto_restart()
+
+def screen_freeze_job():
+    """
+    Screen output monitoring (frozen process detection)
+    """
+    global auto_restart_scheduled
+    if check_gensyn_screen_running():
+        current_output = get_screen_output("gensyn", 20)
+
+        if current_output is not None:
+            now = datetime.utcnow()
+            gensyn_freeze.observe(current_output, now)
+            frozen_duration = gensyn_freeze.frozen_for(now)
+            if frozen_duration > timedelta(minutes=SCREEN_FREEZE_MINUTES):
+                # No meaningful change for 30+ minutes, trigger restart
+                if not auto_restart_scheduled:
+                    if auto_start_enabled:
+                        schedule_auto_restart(
+                            f"❗ Gensyn process frozen for {SCREEN_FREEZE_MINUTES}min! Auto-restarting in {AUTO_RESTART_DELAY_MINUTES} minutes..."
+                        )
+                    else:
+                        markup = InlineKeyboardMarkup()
+                        markup.add(InlineKeyboardButton("🔄 Restart", callback_data="manual_restart_gensyn"))
+                        send_alert(
+                            f"❗ Gensyn process frozen for {SCREEN_FREEZE_MINUTES}min! For restarting click below:",
+                            reply_markup=markup
+                        )
+                    gensyn_freeze.restart_clock(now)  # Reset to avoid spam
+    else:
+        # Screen not running - check if it crashed
+        now = datetime.utcnow()
+        last_screen_missing_alert = monitor_state["last_screen_missing_alert"]
+        # Only alert once every 10 minutes to prevent spam
+        should_alert = (last_screen_missing_alert is None or
+                       (now - last_screen_missing_alert) > timedelta(minutes=10))
+
+        if should_alert:
+            monitor_state["last_screen_missing_alert"] = now
+            if auto_start_enabled and not auto_restart_scheduled:
+                # Auto-start enabled: restart immediately
+                auto_restart_scheduled = True
+                send_alert("❗ Gensyn screen missing (crashed)! Auto-restarting with backup...")
+                submit_job(USER_ID, "restart", auto_restart_gensyn, "Restart Gensyn")
+            else:
+                # Auto-start disabled: send manual restart button
+                markup = InlineKeyboardMarkup()
+                markup.add(InlineKeyboardButton("🔄 Restart", callback_data="manual_restart_gensyn"))
+                send_alert(
+                    "❗ Gensyn screen missing (crashed)! For restarting click below:",
+                    reply_markup=markup
+                )
 
-            time.sleep(60)
+        # Reset monitoring
+        gensyn_freeze.reset()
 
-        except Exception as e:
-            logging.error("Monitor error: %s", str(e))
-            time.sleep(10)
+def send_wandb_log(chat_id, log_path):
+    """
+    Send a wandb log, or its tail if it is too large for Telegram
+    """
+    try:
+        if log_path and os.path.exists(log_path):
+            if os.path.getsize(log_path) > WANDB_LOG_MAX_SEND_BYTES:
+                tail = "\n".join(tail_lines(log_path, WANDB_LOG_TAIL_LINES))
+                bot.send_document(
+                    chat_id,
+                    tail.encode("utf-8"),
+                    visible_file_name=f"tail_{os.path.basename(log_path)}",
+                    caption=f"Log too large, last {WANDB_LOG_TAIL_LINES} lines"
+                )
+            else:
+                with open(log_path, "rb") as f:
+                    bot.send_document(chat_id, f)
+        else:
+            bot.send_message(chat_id, "No log file found.")
+    except Exception as e:
+        bot.send_message(chat_id, f"Error sending log: {str(e)}")
+
+def on_new_wandb_runs(runs):
+    """
+    Called by the WANDB watcher once per burst of new run directories
+    """
+    wandb_index.add_runs(runs)
+    markup = InlineKeyboardMarkup()
+    markup.add(
+        InlineKeyboardButton("Yes", callback_data="wandb_send_log"),
+        InlineKeyboardButton("📚 Pick a run", callback_data="wandb_runs"),
+        InlineKeyboardButton("No", callback_data="wandb_skip_log")
+    )
+    send_alert(f"🪄 WANDB detected: {', '.join(runs)}. Want log file?", reply_markup=markup)
+
+# New wandb runs are picked up from inotify events (or a cheap top-level
+# listing where inotify is unavailable) instead of walking the whole tree
+WANDB_DEBOUNCE_SECONDS = 10
+wandb_watcher = WandbWatcher(WANDB_LOG_DIR, on_new_wandb_runs, debounce=WANDB_DEBOUNCE_SECONDS,
+                             poll_interval=MONITOR_INTERVAL_SECONDS)
+
+def compact_swarm_events_job():
+    dropped = swarm_events.compact()
+    if dropped:
+        logging.info(f"Dropped {dropped} swarm events older than {SWARM_EVENTS_RETENTION_DAYS} days")
+
+def register_monitor_jobs():
+    """
+    Register each health check as its own scheduled job, so a slow probe
+    (e.g. api.ipify.org) never delays the others
+    """
+    scheduler.add("api_ping", check_api_job, MONITOR_INTERVAL_SECONDS, timeout=20, delay=0)
+    scheduler.add("ip_check", check_ip_job, MONITOR_INTERVAL_SECONDS, timeout=60, delay=0)
+    scheduler.add("log_freshness", log_freshness_job, MONITOR_INTERVAL_SECONDS, timeout=20, delay=0)
+    scheduler.add("screen_freeze", screen_freeze_job, MONITOR_INTERVAL_SECONDS, timeout=20, delay=0)
+    scheduler.add("backup_sync", backup_user_data_sync, MONITOR_INTERVAL_SECONDS, timeout=30, delay=0)
+    scheduler.add("live_status", live_status_job, LIVE_STATUS_SECONDS, timeout=60, delay=0)
+    scheduler.add("swarm_events_compact", compact_swarm_events_job, 24 * 3600, timeout=120)
 
 def restore_from_telegram_backup(chat_id):
     """
@@ -1563,18 +1976,227 @@ def restore_from_telegram_backup(chat_id):
             chat_id,
             f"📥 **Restore Backup Files**\n\n"
             f"Missing files:\n{missing_list}\n\n"
-            f"📤 Please send me these files as documents.\n"
-            f"I'll automatically save them to the correct locations!\n\n"
-            f"💡 Tip: Use '🗂️ Get Backup' button to download files from another VPS first."
+            f"📤 Send me the backup file (*{BUNDLE_SUFFIX}) made by '🗂️ Get Backup' on your other VPS.\n"
+            f"It is checked and all files are restored in one step.\n\n"
+            f"💡 Single files (swarm.pem, userData.json, userApiKey.json) are still accepted too."
         )
             
     except Exception as e:
         logging.error(f"Restore from Telegram failed: {str(e)}")
         bot.send_message(chat_id, f"❌ Restore failed: {str(e)}")
 
-threading.Thread(target=monitor, daemon=True).start()
+# Buttons handled natively on the event loop when ASYNC_MODE is on: shell
+# and HTTP work is awaited, long actions go to the job executor, and only
+# quick ones go through callback_query() on the sync bot's worker pool
+async def check_ip_async(core, call):
+    try:
+        ip = (await core.fetch_text('https://api.ipify.org', timeout=10)).strip()
+        await core.bot.send_message(call.message.chat.id, f"🌐 Current Public IP: {ip}")
+    except Exception as e:
+        await core.bot.send_message(call.message.chat.id, f"❌ Error checking IP: {str(e)}")
+
+async def kill_gensyn_async(core, call):
+    try:
+        await run_shell("screen -S gensyn -X quit", timeout=30, check=True)
+        await core.bot.send_message(call.message.chat.id, "🛑 gensyn screen killed (and all child processes).")
+    except subprocess.CalledProcessError as e:
+        await core.bot.send_message(call.message.chat.id, f"❌ Failed to kill gensyn screen: {str(e)}")
+
+async def toggle_tmate_async(core, call):
+    global tmate_running
+    chat_id = call.message.chat.id
+    if not tmate_running:
+        try:
+            await run_shell("tmate -S /tmp/tmate.sock new-session -d", timeout=30, check=True)
+            await run_shell("tmate -S /tmp/tmate.sock wait tmate-ready", timeout=60, check=True)
+            result = await run_shell("tmate -S /tmp/tmate.sock display -p '#{tmate_ssh}'", timeout=30, check=True)
+            ssh_line = result.stdout.strip()
+            tmate_running = True
+            await core.bot.edit_message_reply_markup(chat_id=chat_id, message_id=call.message.message_id, reply_markup=get_menu())
+            await core.bot.send_message(chat_id, f"<code>{ssh_line}</code>", parse_mode="HTML")
+        except Exception as e:
+            tmate_running = False
+            await core.bot.send_message(chat_id, f"❌ Failed to start tmate: {str(e)}")
+    else:
+        try:
+            await run_shell("tmate -S /tmp/tmate.sock kill-server", timeout=30, check=True)
+            tmate_running = False
+            await core.bot.edit_message_reply_markup(chat_id=chat_id, message_id=call.message.message_id, reply_markup=get_menu())
+            await core.bot.send_message(chat_id, "🛑 Terminal session killed.")
+        except Exception as e:
+            await core.bot.send_message(chat_id, f"❌ Failed to kill tmate: {str(e)}")
+
+async def vpn_async(core, call):
+    chat_id = call.message.chat.id
+    if call.data == "vpn_on":
+        result = await run_shell("wg-quick up wg0", timeout=60)
+        if result.returncode == 0:
+            message = "✅ VPN enabled"
+        elif "already exists" in result.stderr:
+            message = "⚠️ VPN already enabled"
+        else:
+            message = f"❌ VPN failed to start: {result.stderr.strip()[-500:]}"
+    else:
+        result = await run_shell("wg-quick down wg0", timeout=60)
+        if result.returncode == 0:
+            message = "❌ VPN disabled"
+        elif "is not a WireGuard interface" in result.stderr:
+            message = "⚠️ VPN already disabled"
+        else:
+            message = f"❌ VPN failed to stop: {result.stderr.strip()[-500:]}"
+    await core.bot.send_message(chat_id, message)
+
+async def gensyn_status_async(core, call):
+    chat_id = call.message.chat.id
+    try:
+        if live_status.is_live(chat_id):
+            await core.run_blocking(show_live_status, chat_id)
+            try:
+                await core.bot.answer_callback_query(call.id, "📌 Live status is pinned above")
+            except Exception:
+                pass
+            return
+        # The status probes and the screenshot are blocking; they run off the loop
+        status_message = await core.run_blocking(format_gensyn_status)
+        status_msg = await core.bot.send_message(chat_id, status_message, parse_mode="HTML", reply_markup=get_menu())
+        photo, caption = await core.run_blocking(render_screen_snapshot)
+        if photo:
+            await core.bot.send_photo(chat_id, photo, caption=caption, reply_to_message_id=status_msg.message_id)
+        else:
+            await core.bot.send_message(chat_id, caption, reply_to_message_id=status_msg.message_id)
+    except Exception as e:
+        logging.error(f"Error in gensyn_status callback: {str(e)}")
+        await core.bot.send_message(chat_id, "❌ Error getting status. Check logs.")
+
+async def bot_update_async(core, call):
+    chat_id = call.message.chat.id
+    try:
+        await core.bot.send_message(chat_id, "Bot update started. Bot will be back in about 1 minute.")
+        update_script_path = "/tmp/bot_update_run.sh"
+        with open(update_script_path, "w") as f:
+            f.write("curl -s https://raw.githubusercontent.com/shairkhan2/gensyn-bot/refs/heads/main/update_bot.sh | bash\n")
+        os.chmod(update_script_path, 0o700)
+        await run_shell(f"echo 'bash {update_script_path} >/tmp/bot_update.log 2>&1' | at now + 1 minute", timeout=30)
+    except Exception as e:
+        await core.bot.send_message(chat_id, f"❌ Failed to update bot: {str(e)}")
+
+def job_callback(kind, func, label, group):
+    """
+    Async handler that hands a blocking button action, func(chat_id), to the job executor
+    """
+    async def handler(core, call):
+        # submit_job may tell the user the job is a duplicate or has to wait
+        await core.run_blocking(submit_job, call.message.chat.id, kind, func, label, group)
+    return handler
+
+def start_gensyn_choice(chat_id):
+    backup_exists = (
+        os.path.exists(os.path.join(SYNC_BACKUP_DIR, "userData.json")) and
+        os.path.exists(os.path.join(SYNC_BACKUP_DIR, "userApiKey.json"))
+    )
+    if backup_exists:
+        markup = InlineKeyboardMarkup()
+        markup.add(
+            InlineKeyboardButton("Run with Login Backup", callback_data="start_gensyn_with_backup"),
+            InlineKeyboardButton("Run Without Login Backup", callback_data="start_gensyn_no_backup")
+        )
+        bot.send_message(chat_id, "Login backup found. How do you want to start?", reply_markup=markup)
+    else:
+        start_gensyn_session(chat_id, use_sync_backup=False)
+
+async def restore_snapshot_async(core, call):
+    snapshot_id = call.data.split(":", 1)[1]
+    await core.run_blocking(submit_job, call.message.chat.id, f"restore_snapshot:{snapshot_id}",
+                            lambda chat_id: restore_snapshot(chat_id, snapshot_id), "Restore login backup", "restore")
+
+async def wandb_log_async(core, call):
+    if call.data == "wandb_send_log":
+        func = lambda chat_id: send_wandb_log(chat_id, wandb_index.latest_log())
+    else:
+        # Only runs in the index can be picked, so the name never becomes an arbitrary path
+        name = call.data.split(":", 1)[1]
+        func = lambda chat_id: send_wandb_log(chat_id, wandb_index.log_for(name))
+    await core.run_blocking(submit_job, call.message.chat.id, call.data, func, "Send WANDB log", "wandb")
+
+def run_async_mode():
+    """
+    Poll on an asyncio event loop (telebot's async API over aiohttp)
+    instead of infinity_polling
+    """
+    core = AsyncBotCore(bot, BOT_TOKEN, authorize=allow_action)
+    core.callback("check_ip")(check_ip_async)
+    core.callback("kill_gensyn")(kill_gensyn_async)
+    core.callback("toggle_tmate")(toggle_tmate_async)
+    core.callback("vpn_on")(vpn_async)
+    core.callback("vpn_off")(vpn_async)
+    core.callback("gensyn_status")(gensyn_status_async)
+    core.callback("bot_update")(bot_update_async)
+    core.callback("start_gensyn")(job_callback("start", start_gensyn_choice, "Start Gensyn", "gensyn"))
+    core.callback("start_gensyn_with_backup")(job_callback(
+        "start", lambda chat_id: start_gensyn_session(chat_id, use_sync_backup=True), "Start Gensyn", "gensyn"))
+    core.callback("start_gensyn_no_backup")(job_callback(
+        "start", lambda chat_id: start_gensyn_session(chat_id, use_sync_backup=False), "Start Gensyn", "gensyn"))
+    core.callback("start_fresh")(job_callback(
+        "start", lambda chat_id: start_gensyn_session(chat_id, use_sync_backup=False, fresh_start=True),
+        "Start Gensyn", "gensyn"))
+    core.callback("set_autostart")(job_callback("autostart", setup_autostart, "Set up autostart", "gensyn"))
+    core.callback("get_backup")(job_callback("get_backup", send_backup_files, "Send backup", "backup"))
+    core.callback("restore_snapshot:", prefix=True)(restore_snapshot_async)
+    core.callback("wandb_send_log")(wandb_log_async)
+    core.callback("wandb_log:", prefix=True)(wandb_log_async)
+    core.run()
+
+def prewarm_heavy_imports():
+    """
+    Load web3 and Pillow in the background after startup, so the first
+    status tap does not pay for importing them
+    """
+    for name, warm in (("web3", get_web3), ("Pillow", screen_renderer.warm_up)):
+        try:
+            warm()
+        except Exception as e:
+            logging.error(f"Prewarm {name} failed: {str(e)}")
+
+def main():
+    global config, BOT_TOKEN, USER_ID
+    logging.basicConfig(
+        filename='/root/bot_error.log',
+        level=logging.ERROR,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    config = load_config()
+    BOT_TOKEN = config["BOT_TOKEN"]
+    USER_ID = int(config["USER_ID"])
+    bot.token = BOT_TOKEN
+    bot.threaded = True
+    bot.worker_pool = util.ThreadPool(bot, num_threads=BOT_WORKER_THREADS)
+
+    os.makedirs(BACKUP_USERDATA_DIR, exist_ok=True)
+    os.makedirs(SYNC_BACKUP_DIR, exist_ok=True)
+    live_status.load()
+    backup_store.keep_last = int(config.get("BACKUP_KEEP_LAST", BACKUP_KEEP_LAST))
+    backup_store.keep_hourly = int(config.get("BACKUP_KEEP_HOURLY", BACKUP_KEEP_HOURLY))
+    backup_store.keep_daily = int(config.get("BACKUP_KEEP_DAILY", BACKUP_KEEP_DAILY))
+
+    start_swarm_log_consumers()
+    register_monitor_jobs()
+    scheduler.start()
+    job_executor.start()
+    outbox.start()
+    wandb_watcher.start()
+    scheduler.run_once("backup_import", import_legacy_backups, 0)
+    scheduler.run_once("backup_snapshot", backup_user_data, 0)
+    if config.get("PREWARM_IMPORTS", "true").strip().lower() not in ("0", "false", "no"):
+        scheduler.run_once("prewarm", prewarm_heavy_imports, PREWARM_DELAY_SECONDS)
+
+    try:
+        if config.get("ASYNC_MODE", "false").strip().lower() in ("1", "true", "yes"):
+            run_async_mode()
+        else:
+            bot.infinity_polling()
+    except Exception as e:
+        logging.error("Bot crashed: %s", str(e))
 
-try:
-    bot.infinity_polling()
-except Exception as e:
-    logging.error("Bot crashed: %s", str(e))
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import logging
+import threading
+
+import http_client
+
+ALCHEMY_RPC = "https://gensyn-testnet.g.alchemy.com/v2/TD5tr7mo4VfXlSaolFlSr3tL70br2M9J"
+GET_EOA_ABI = [
+    {
+        "name": "getEoa",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "peerIds", "type": "string[]"}],
+        "outputs": [{"name": "", "type": "address[]"}]
+    }
+]
+
+# A peer id -> EOA mapping does not change once registered, so known
+# mappings never expire; unregistered peers (zero address) are re-checked
+# after this long in case they register
+EOA_NEGATIVE_TTL = 3600
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Max peer ids sent in one getEoa call
+EOA_BATCH_SIZE = 50
+
+_web3 = None
+_contracts = {}
+_web3_lock = threading.Lock()
+
+
+def get_web3(rpc_url=ALCHEMY_RPC):
+    """
+    Return the process-wide Web3 instance, importing web3 and building the
+    provider on first use. The provider rides on the shared keep-alive session.
+    """
+    global _web3
+    with _web3_lock:
+        if _web3 is None:
+            from web3 import Web3
+            _web3 = Web3(Web3.HTTPProvider(
+                rpc_url,
+                request_kwargs={"timeout": 15},
+                session=http_client.get_session()
+            ))
+        return _web3
+
+
+def get_contract(address):
+    """
+    Return the cached getEoa contract handle for a contract address.
+    """
+    w3 = get_web3()
+    key = address.lower()
+    with _web3_lock:
+        contract = _contracts.get(key)
+        if contract is None:
+            contract = w3.eth.contract(address=w3.to_checksum_address(address), abi=GET_EOA_ABI)
+            _contracts[key] = contract
+        return contract
+
+
+class EoaCache:
+    """
+    Persistent per-peer-id EOA cache, one section per contract address:
+    {"version": 2, "entries": {contract: {peer_id: {"eoa": str, "at": epoch}}}}
+    Known mappings are kept for good; only zero-address (unregistered)
+    entries expire, each on its own after EOA_NEGATIVE_TTL, so adding a
+    peer never invalidates the others.
+    """
+
+    def __init__(self, path, legacy_contract=None):
+        self.path = path
+        self.legacy_contract = legacy_contract
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        # Caller holds self._lock. The file is read on first use, not at construction
+        if self._loaded:
+            return
+        self._loaded = True
+        self._load(self.legacy_contract)
+
+    def _load(self, legacy_contract):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == 2:
+            self._entries = data.get("entries", {})
+        elif isinstance(data, dict) and legacy_contract and isinstance(data.get("mapping"), dict):
+            # Old whole-file {"date", "mapping"} cache: keep the mappings, which never change
+            now = time.time()
+            self._entries = {
+                legacy_contract.lower(): {
+                    pid: {"eoa": eoa, "at": now}
+                    for pid, eoa in data["mapping"].items()
+                    if isinstance(eoa, str) and eoa.startswith("0x")
+                }
+            }
+
+    def _save(self):
+        # bot.py and reward.py may share the file: merge with what is on disk
+        # so each process only overwrites the entries it resolved
+        merged = {}
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get("version") == 2:
+                merged = data.get("entries", {})
+        except (FileNotFoundError, ValueError):
+            pass
+        for contract, section in self._entries.items():
+            merged.setdefault(contract, {}).update(section)
+        self._entries = merged
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 2, "entries": self._entries}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def get(self, contract, peer_id):
+        """
+        Return the cached EOA for peer_id, or None if unknown (or a
+        zero-address entry older than EOA_NEGATIVE_TTL).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(contract.lower(), {}).get(peer_id)
+        if not entry:
+            return None
+        if entry["eoa"] == ZERO_ADDRESS and time.time() - entry["at"] > EOA_NEGATIVE_TTL:
+            return None
+        return entry["eoa"]
+
+    def update(self, contract, mapping):
+        """
+        Merge freshly resolved {peer_id: eoa} pairs and persist the cache.
+        """
+        self.update_many({contract: mapping})
+
+    def update_many(self, resolved):
+        """
+        Merge {contract: {peer_id: eoa}} for any number of contracts and
+        persist the cache once.
+        """
+        resolved = {contract: mapping for contract, mapping in resolved.items() if mapping}
+        if not resolved:
+            return
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            for contract, mapping in resolved.items():
+                section = self._entries.setdefault(contract.lower(), {})
+                for peer_id, eoa in mapping.items():
+                    section[peer_id] = {"eoa": eoa, "at": now}
+            try:
+                self._save()
+            except Exception as e:
+                logging.error(f"EOA cache save error: {str(e)}")
+
+
+def _call_get_eoa(calls):
+    """
+    Run getEoa for each (contract_address, peer_ids) pair and return the
+    address lists in the same order. Several calls go out as a single
+    JSON-RPC batch request when the installed web3 supports it.
+    """
+    if len(calls) == 1:
+        address, chunk = calls[0]
+        return [get_contract(address).functions.getEoa(chunk).call()]
+    w3 = get_web3()
+    if hasattr(w3, "batch_requests"):
+        with w3.batch_requests() as batch:
+            for address, chunk in calls:
+                batch.add(get_contract(address).functions.getEoa(chunk))
+            return batch.execute()
+    return [get_contract(address).functions.getEoa(chunk).call() for address, chunk in calls]
+
+
+def resolve_eoas_multi(cache, contract_addresses, peer_ids, batch_size=EOA_BATCH_SIZE):
+    """
+    Resolve peer ids against one or more contracts.
+    Only ids missing from the cache are queried, chunked at batch_size per
+    getEoa call, with every chunk for every contract sent in one round-trip.
+    Returns {contract_address: {peer_id: eoa}}.
+    """
+    result = {}
+    calls = []
+    for address in contract_addresses:
+        mapping = {}
+        missing = []
+        for peer_id in peer_ids:
+            eoa = cache.get(address, peer_id)
+            if eoa:
+                mapping[peer_id] = eoa
+            elif peer_id not in missing:
+                missing.append(peer_id)
+        result[address] = mapping
+        for i in range(0, len(missing), batch_size):
+            calls.append((address, missing[i:i + batch_size]))
+
+    if calls:
+        resolved = {}
+        for (address, chunk), addresses in zip(calls, _call_get_eoa(calls)):
+            resolved.setdefault(address, {}).update(zip(chunk, addresses))
+        # One merge-and-rewrite of the cache file for the whole batch
+        cache.update_many(resolved)
+        for address, mapping in resolved.items():
+            result[address].update(mapping)
+    return result
+
+
+def resolve_eoas(cache, contract_address, peer_ids, batch_size=EOA_BATCH_SIZE):
+    """
+    Return {peer_id: eoa} for peer_ids, asking the contract only for ids
+    that are not already cached.
+    """
+    return resolve_eoas_multi(cache, [contract_address], peer_ids, batch_size)[contract_address]
@@ -0,0 +1,274 @@
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeout used when a call does not pass its own
+DEFAULT_TIMEOUT = (5, 10)
+
+# Per-host pool sizes and default timeouts; other hosts share the default adapter
+HOST_LIMITS = {
+    "https://dashboard.gensyn.ai": {"pool": 4, "timeout": (5, 10)},
+    "https://dashboard-math.gensyn.ai": {"pool": 4, "timeout": (5, 10)},
+    "https://api.ipify.org": {"pool": 2, "timeout": (5, 10)},
+    "https://api.telegram.org": {"pool": 8, "timeout": (5, 30)},
+    "https://gensyn-testnet.g.alchemy.com": {"pool": 4, "timeout": (5, 15)},
+    "http://localhost:3000": {"pool": 2, "timeout": (2, 5)},
+}
+DEFAULT_POOL_SIZE = 4
+
+# Statuses worth retrying; anything else is returned to the caller as-is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 30
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _host_key(url):
+    parts = urlsplit(url)
+    return parts.netloc or parts.path
+
+
+def _host_stats(host):
+    stats = _stats.get(host)
+    if stats is None:
+        stats = {"requests": 0, "errors": 0, "retries": 0, "latency_total": 0.0, "latency_max": 0.0}
+        _stats[host] = stats
+    return stats
+
+
+def _record_response(response, *args, **kwargs):
+    # Response hook: runs for every response through the shared session,
+    # including telebot's calls once it is pointed at it
+    latency = response.elapsed.total_seconds()
+    with _stats_lock:
+        stats = _host_stats(_host_key(response.url))
+        stats["requests"] += 1
+        stats["latency_total"] += latency
+        stats["latency_max"] = max(stats["latency_max"], latency)
+
+
+def get_session():
+    """
+    Return the process-wide keep-alive session, creating it on first use.
+    Each known host gets its own connection pool sized by HOST_LIMITS.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            default = HTTPAdapter(pool_connections=len(HOST_LIMITS), pool_maxsize=DEFAULT_POOL_SIZE)
+            session.mount("http://", default)
+            session.mount("https://", default)
+            for prefix, limits in HOST_LIMITS.items():
+                session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=limits["pool"]))
+            session.hooks["response"].append(_record_response)
+            _session = session
+        return _session
+
+
+def _default_timeout(url):
+    for prefix, limits in HOST_LIMITS.items():
+        if url.startswith(prefix):
+            return limits["timeout"]
+    return DEFAULT_TIMEOUT
+
+
+def _backoff_delay(attempt, backoff, response=None, max_delay=MAX_RETRY_AFTER):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), max_delay)
+        if response.status_code == 429:
+            # Telegram's Bot API puts the wait in the JSON body
+            try:
+                retry_after = response.json()["parameters"]["retry_after"]
+                return min(float(retry_after), max_delay)
+            except Exception:
+                pass
+    # Exponential backoff with full jitter around the nominal delay
+    return min(backoff * (2 ** attempt) * random.uniform(0.5, 1.5), max_delay)
+
+
+def request(method, url, timeout=None, retries=None, backoff=0.5, max_delay=MAX_RETRY_AFTER, **kwargs):
+    """
+    Send a request through the shared session.
+    Connection errors, timeouts and retryable statuses are retried with
+    jittered exponential backoff (GET: 2 retries by default, other methods
+    none); no wait between attempts, Retry-After included, exceeds
+    max_delay. The last response is returned, or the last exception re-raised.
+    """
+    if retries is None:
+        retries = 2 if method.upper() == "GET" else 0
+    if timeout is None:
+        timeout = _default_timeout(url)
+    session = get_session()
+    host = _host_key(url)
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            with _stats_lock:
+                _host_stats(host)["errors"] += 1
+            if attempt >= retries:
+                raise
+            delay = _backoff_delay(attempt, backoff, max_delay=max_delay)
+            logging.debug(f"{method} {host} failed ({str(e)}), retrying in {delay:.1f}s")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            with _stats_lock:
+                _host_stats(host)["errors"] += 1
+            delay = _backoff_delay(attempt, backoff, response, max_delay)
+        with _stats_lock:
+            _host_stats(host)["retries"] += 1
+        time.sleep(delay)
+        attempt += 1
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def host_stats():
+    """
+    Per-host counters: requests, errors, retries, average/max latency (seconds)
+    and how many requests reused a pooled connection instead of opening one.
+    """
+    session = get_session()
+    pools = {}
+    for adapter in set(session.adapters.values()):
+        for key in list(adapter.poolmanager.pools.keys()):
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            entry = pools.setdefault(host, {"connections": 0, "pool_requests": 0})
+            entry["connections"] += pool.num_connections
+            entry["pool_requests"] += pool.num_requests
+
+    result = {}
+    with _stats_lock:
+        hosts = set(_stats) | set(pools)
+        for host in sorted(hosts):
+            stats = dict(_host_stats(host))
+            pool = pools.get(host, {"connections": 0, "pool_requests": 0})
+            stats["connections_opened"] = pool["connections"]
+            stats["connections_reused"] = max(0, pool["pool_requests"] - pool["connections"])
+            stats["latency_avg"] = stats["latency_total"] / stats["requests"] if stats["requests"] else 0.0
+            result[host] = stats
+    return result
+
+
+class FetchError(Exception):
+    """
+    Raised by JsonCache when a URL has no usable cached copy and the fetch
+    did not return 200/304.
+    """
+
+    def __init__(self, url, status_code):
+        super().__init__(f"{_host_key(url)} returned {status_code}")
+        self.url = url
+        self.status_code = status_code
+
+
+class JsonCache:
+    """
+    In-process cache of JSON GET responses keyed by full URL (endpoint + query).
+    Entries younger than `ttl` are served as-is. Older entries, up to
+    ttl + max_stale, are served immediately while one background refresh
+    runs. Refreshes are conditional (If-None-Match / If-Modified-Since),
+    so an unchanged resource costs a 304. A failed refresh keeps the
+    stale copy.
+    """
+
+    def __init__(self, ttl=60, max_stale=3600, max_entries=256):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _fetch(self, url, **kwargs):
+        with self._lock:
+            entry = self._entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = get(url, headers=headers, **kwargs)
+        now = time.monotonic()
+        if response.status_code == 304 and entry:
+            with self._lock:
+                entry["fetched"] = now
+            return entry["data"]
+        if response.status_code != 200:
+            raise FetchError(url, response.status_code)
+        data = response.json()
+        with self._lock:
+            if url not in self._entries and len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k]["fetched"])
+                del self._entries[oldest]
+            self._entries[url] = {
+                "data": data,
+                "fetched": now,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        return data
+
+    def _refresh(self, url):
+        try:
+            self._fetch(url)
+        except Exception as e:
+            logging.error(f"Background refresh of {_host_key(url)} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(url)
+
+    def get_json(self, url, ttl=None, max_stale=None, **kwargs):
+        """
+        Return the JSON body for url, from cache when possible.
+        Only blocks on the network when there is no entry or it is older
+        than ttl + max_stale. Raises FetchError or a requests exception
+        in that case if the fetch fails. Extra keyword arguments (timeout,
+        retries, max_delay) apply to that blocking fetch.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        max_stale = self.max_stale if max_stale is None else max_stale
+        with self._lock:
+            entry = self._entries.get(url)
+            age = time.monotonic() - entry["fetched"] if entry else None
+            if entry and age < ttl:
+                return entry["data"]
+            if entry and age < ttl + max_stale:
+                if url not in self._refreshing:
+                    self._refreshing.add(url)
+                    threading.Thread(target=self._refresh, args=(url,), daemon=True).start()
+                return entry["data"]
+        return self._fetch(url, **kwargs)
+
+    def invalidate(self, url=None):
+        """
+        Drop one URL (or everything) from the cache.
+        """
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
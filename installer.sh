@@ -62,7 +62,8 @@ pip install \
     requests==2.32.3 \
     playwright==1.44.0 \
     web3 \
-    Pillow
+    Pillow \
+    aiohttp
 
 # Optionally update requirements.txt for future reference
 echo "pyTelegramBotAPI==4.13.0
@@ -71,6 +72,7 @@ requests==2.32.3
 playwright==1.44.0
 web3
 Pillow
+aiohttp
 " > requirements.txt
 
 # Install Playwright browsers
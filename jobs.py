@@ -0,0 +1,207 @@
+import time
+import logging
+import itertools
+import threading
+from collections import deque
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_local = threading.local()
+
+
+class JobCancelled(Exception):
+    """
+    Raised by check_cancelled() inside a job whose cancellation was requested.
+    """
+
+
+def current_job():
+    """
+    Return the Job running in this thread, or None outside the executor.
+    """
+    return getattr(_local, "job", None)
+
+
+def set_progress(text):
+    """
+    Record a short progress note for the current job (shown in /jobs).
+    """
+    job = current_job()
+    if job is not None:
+        job.progress = text
+
+
+def cancel_requested():
+    """
+    True if the current job has been asked to stop. Jobs call this between
+    steps, at points where stopping leaves nothing half done.
+    """
+    job = current_job()
+    return job is not None and job.cancel_event.is_set()
+
+
+def check_cancelled():
+    if cancel_requested():
+        raise JobCancelled()
+
+
+class Job:
+    """
+    One submitted action, its state and timings.
+    """
+
+    def __init__(self, job_id, kind, label, group, func, args):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.group = group
+        self.func = func
+        self.args = args
+        self.state = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = None
+        self.error = None
+        self.cancel_event = threading.Event()
+
+    def elapsed(self, now=None):
+        """
+        Seconds running (or waiting, while queued), up to now or to when it finished.
+        """
+        end = self.finished or now or time.time()
+        return end - (self.started or self.submitted)
+
+
+class JobExecutor:
+    """
+    Fixed pool of worker threads for long-running actions.
+    - a job kind is queued or running at most once: submitting it again
+      returns the existing job (double taps are de-duplicated)
+    - jobs in the same group never run at the same time; a queued job
+      waits until its group is free, without holding up other groups
+    - queued jobs can be cancelled outright; running ones are asked to stop
+      and do so at their next cancel_requested() check
+    """
+
+    def __init__(self, workers=2, history=20):
+        self.workers = workers
+        self._queue = deque()
+        self._running = {}
+        self._history = deque(maxlen=history)
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._threads = []
+
+    def start(self):
+        with self._cond:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f"job-worker-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def submit(self, kind, func, *args, label=None, group=None):
+        """
+        Queue func(*args) as a job of the given kind.
+        Returns (job, created); created is False when a job of this kind was
+        already queued or running, in which case that job is returned.
+        """
+        with self._cond:
+            for job in list(self._running.values()) + list(self._queue):
+                if job.kind == kind:
+                    return job, False
+            job = Job(next(self._ids), kind, label or kind, group or kind, func, args)
+            self._queue.append(job)
+            self._cond.notify_all()
+            return job, True
+
+    def waiting_on(self, job):
+        """
+        Return the job a queued job is waiting for: the running (or earlier
+        queued) job of its group, else a running job holding a worker.
+        None if it is not queued or nothing is in its way.
+        """
+        with self._cond:
+            if job.state != QUEUED:
+                return None
+            for other in list(self._running.values()) + list(self._queue):
+                if other is job:
+                    break
+                if other.group == job.group:
+                    return other
+            if len(self._running) >= self.workers:
+                return min(self._running.values(), key=lambda j: j.started)
+            return None
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job or ask a running one to stop.
+        Returns the job, or None if it is not queued or running.
+        """
+        with self._cond:
+            for job in self._queue:
+                if job.id == job_id:
+                    self._queue.remove(job)
+                    job.cancel_event.set()
+                    job.state = CANCELLED
+                    job.finished = time.time()
+                    self._history.append(job)
+                    return job
+            job = self._running.get(job_id)
+            if job is not None:
+                job.cancel_event.set()
+            return job
+
+    def snapshot(self):
+        """
+        Return (active, recent): running then queued jobs in order, and the
+        most recently finished jobs, newest first.
+        """
+        with self._cond:
+            active = sorted(self._running.values(), key=lambda j: j.started) + list(self._queue)
+            return active, list(reversed(self._history))
+
+    def _next_job(self):
+        # Caller holds self._cond
+        busy = {job.group for job in self._running.values()}
+        for job in self._queue:
+            if job.group not in busy:
+                self._queue.remove(job)
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                job.state = RUNNING
+                job.started = time.time()
+                self._running[job.id] = job
+
+            _local.job = job
+            try:
+                job.func(*job.args)
+                state = CANCELLED if job.cancel_event.is_set() else DONE
+            except JobCancelled:
+                state = CANCELLED
+            except Exception as e:
+                state = FAILED
+                job.error = str(e)
+                logging.error(f"Job {job.label} failed: {str(e)}")
+            finally:
+                _local.job = None
+
+            with self._cond:
+                del self._running[job.id]
+                job.state = state
+                job.finished = time.time()
+                self._history.append(job)
+                # A finished job may free its group for a queued one
+                self._cond.notify_all()
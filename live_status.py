@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+
+def content_hash(*parts):
+    """
+    Short digest of the given str/bytes parts, used to skip no-op edits.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        if part is None:
+            part = b""
+        elif isinstance(part, str):
+            part = part.encode("utf-8", errors="ignore")
+        digest.update(len(part).to_bytes(4, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def markup_hash(markup):
+    return content_hash(markup.to_json()) if markup is not None else None
+
+
+def not_modified(exc):
+    # Telegram answers an edit with identical content with a 400
+    return "message is not modified" in str(exc)
+
+
+class ProgressMessage:
+    """
+    One chat message that is edited in place as a long action advances,
+    instead of deleting and re-sending it for every step. If the edit
+    fails (e.g. the message was deleted) a fresh message is sent.
+    """
+
+    def __init__(self, bot, chat_id, parse_mode=None):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.parse_mode = parse_mode
+        self.message_id = None
+        self.text = None
+
+    def update(self, text):
+        if text == self.text:
+            return
+        if self.message_id is not None:
+            try:
+                self.bot.edit_message_text(text, chat_id=self.chat_id, message_id=self.message_id,
+                                           parse_mode=self.parse_mode)
+                self.text = text
+                return
+            except Exception as e:
+                if not_modified(e):
+                    self.text = text
+                    return
+        msg = self.bot.send_message(self.chat_id, text, parse_mode=self.parse_mode)
+        self.message_id = msg.message_id
+        self.text = text
+
+
+class LiveStatus:
+    """
+    A pinned status message, plus a screenshot message under it, kept per
+    chat and edited in place. Each render is hashed and Telegram is only
+    called when the text, keyboard or image actually changed, so refreshing
+    an unchanged dashboard costs no API calls. The message ids and the set
+    of chats in live mode are kept in a small JSON file so they survive a
+    restart.
+    """
+
+    def __init__(self, bot, path):
+        self.bot = bot
+        self.path = path
+        self._chats = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Read the saved message ids and live chats, if any.
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            for chat_id, entry in data.items():
+                self._chats[int(chat_id)] = {
+                    "live": bool(entry.get("live")),
+                    "status_id": entry.get("status_id"),
+                    "screen_id": entry.get("screen_id"),
+                    "status_hash": None,
+                    "screen_hash": None,
+                    "updated": None,
+                }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Error loading live status state: {str(e)}")
+
+    def _save(self):
+        # Caller holds self._lock
+        data = {
+            str(chat_id): {"live": entry["live"], "status_id": entry["status_id"], "screen_id": entry["screen_id"]}
+            for chat_id, entry in self._chats.items()
+        }
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Error saving live status state: {str(e)}")
+
+    def _entry(self, chat_id):
+        entry = self._chats.get(chat_id)
+        if entry is None:
+            entry = self._chats[chat_id] = {
+                "live": False, "status_id": None, "screen_id": None,
+                "status_hash": None, "screen_hash": None, "updated": None,
+            }
+        return entry
+
+    def live_chats(self):
+        with self._lock:
+            return [chat_id for chat_id, entry in self._chats.items() if entry["live"]]
+
+    def is_live(self, chat_id):
+        with self._lock:
+            entry = self._chats.get(chat_id)
+            return bool(entry and entry["live"])
+
+    def set_live(self, chat_id, live):
+        with self._lock:
+            entry = self._entry(chat_id)
+            entry["live"] = live
+            if not live:
+                # The next status starts a fresh dashboard
+                entry.update(status_id=None, screen_id=None, status_hash=None, screen_hash=None, updated=None)
+            self._save()
+
+    def age(self, chat_id):
+        """
+        Seconds since the chat's dashboard was last refreshed, or None.
+        """
+        with self._lock:
+            entry = self._chats.get(chat_id)
+            if entry is None or entry["updated"] is None:
+                return None
+            return time.monotonic() - entry["updated"]
+
+    def _update_status(self, chat_id, entry, text, markup):
+        digest = content_hash(text, markup_hash(markup))
+        if entry["status_id"] is not None:
+            if digest == entry["status_hash"]:
+                return False
+            try:
+                self.bot.edit_message_text(text, chat_id=chat_id, message_id=entry["status_id"],
+                                           parse_mode="HTML", reply_markup=markup)
+                entry["status_hash"] = digest
+                return True
+            except Exception as e:
+                if not_modified(e):
+                    entry["status_hash"] = digest
+                    return False
+                logging.error(f"Live status edit failed, sending a new one: {str(e)}")
+        msg = self.bot.send_message(chat_id, text, parse_mode="HTML", reply_markup=markup)
+        entry["status_id"] = msg.message_id
+        entry["status_hash"] = digest
+        # The screenshot goes under the new status message
+        entry["screen_id"] = None
+        entry["screen_hash"] = None
+        try:
+            self.bot.pin_chat_message(chat_id, msg.message_id, disable_notification=True)
+        except Exception as e:
+            logging.error(f"Could not pin live status: {str(e)}")
+        self._save()
+        return True
+
+    def _update_screen(self, chat_id, entry, photo, caption):
+        from telebot.types import InputMediaPhoto
+        digest = content_hash(photo, caption)
+        if entry["screen_id"] is not None:
+            if digest == entry["screen_hash"]:
+                return False
+            try:
+                if photo is not None:
+                    self.bot.edit_message_media(InputMediaPhoto(photo, caption=caption),
+                                                chat_id=chat_id, message_id=entry["screen_id"])
+                else:
+                    # Keep the last screenshot, only the caption says why it is stale
+                    self.bot.edit_message_caption(caption, chat_id=chat_id, message_id=entry["screen_id"])
+                entry["screen_hash"] = digest
+                return True
+            except Exception as e:
+                if not_modified(e):
+                    entry["screen_hash"] = digest
+                    return False
+                logging.error(f"Live screen edit failed, sending a new one: {str(e)}")
+        if photo is None:
+            # Nothing to show yet; no message is kept for a missing screen
+            if entry["screen_hash"] == digest:
+                return False
+            self.bot.send_message(chat_id, caption, reply_to_message_id=entry["status_id"])
+            entry["screen_hash"] = digest
+            return True
+        msg = self.bot.send_photo(chat_id, photo, caption=caption, reply_to_message_id=entry["status_id"])
+        entry["screen_id"] = msg.message_id
+        entry["screen_hash"] = digest
+        self._save()
+        return True
+
+    def show(self, chat_id, text, markup=None, photo=None, caption=None):
+        """
+        Bring the chat's dashboard up to date with this render.
+        Returns the number of Telegram calls that were needed (0 if nothing changed).
+        """
+        with self._lock:
+            entry = self._entry(chat_id)
+            calls = 0
+            if self._update_status(chat_id, entry, text, markup):
+                calls += 1
+            if caption is not None and self._update_screen(chat_id, entry, photo, caption):
+                calls += 1
+            entry["updated"] = time.monotonic()
+            return calls
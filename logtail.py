@@ -0,0 +1,212 @@
+import os
+import logging
+import threading
+from collections import deque
+
+# Block size used when seeking backwards from the end of a file
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def _read_tail_bytes(f, n, end, block_size=TAIL_BLOCK_SIZE):
+    """
+    Read backwards from byte offset `end` in fixed-size blocks until the data
+    covers at least the last n lines. Returns (data, start_offset); a leading
+    partial line is dropped unless the read reached the start of the file.
+    """
+    pos = end
+    chunks = []
+    newlines = 0
+    # n + 1 newlines guarantee the n-th line from the end is complete
+    while pos > 0 and newlines <= n:
+        size = min(block_size, pos)
+        pos -= size
+        f.seek(pos)
+        chunk = f.read(size)
+        chunks.append(chunk)
+        newlines += chunk.count(b"\n")
+    data = b"".join(reversed(chunks))
+    if pos > 0:
+        cut = data.find(b"\n") + 1
+        data = data[cut:]
+        pos += cut
+    return data, pos
+
+
+def _skip_trailing_blank(f, end, block_size=TAIL_BLOCK_SIZE):
+    """
+    Return the offset just after the last non-whitespace byte before `end`.
+    """
+    pos = end
+    while pos > 0:
+        size = min(block_size, pos)
+        f.seek(pos - size)
+        chunk = f.read(size).rstrip()
+        if chunk:
+            return pos - size + len(chunk)
+        pos -= size
+    return 0
+
+
+def tail_lines(path, n, block_size=TAIL_BLOCK_SIZE, skip_blank=False):
+    """
+    Return the last n lines of a file without reading the whole file.
+    Cost depends on n and the line length, not on the file size.
+    With skip_blank, trailing blank lines (e.g. the padding of a screen
+    hardcopy) are ignored, like content.strip() would.
+    """
+    if n <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if skip_blank:
+            end = _skip_trailing_blank(f, end, block_size)
+        data, _ = _read_tail_bytes(f, n, end, block_size)
+    lines = data.split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    return [line.decode("utf-8", errors="ignore").rstrip("\r") for line in lines[-n:]]
+
+
+class LogFollower:
+    """
+    Follows an append-only log file (tail -F style).
+    Keeps the byte offset and inode between polls so only newly appended
+    bytes are read, and detects truncation and rotation.
+    The most recent lines are kept in a bounded in-memory ring.
+    """
+
+    def __init__(self, path, max_lines=1000):
+        self.path = path
+        self.max_lines = max_lines
+        self.lines = deque(maxlen=max_lines)
+        self._offset = 0
+        self._inode = None
+        self._partial = b""
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """
+        Register callback(lines) to receive every batch of new complete lines,
+        in file order, including lines that have already left the ring.
+        Callbacks run inside poll() and must not poll this follower themselves.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _reset(self):
+        self.lines.clear()
+        self._offset = 0
+        self._inode = None
+        self._partial = b""
+
+    def _consume(self, data):
+        """
+        Split freshly read bytes into complete lines and push them into the ring.
+        An unterminated trailing fragment is kept until its newline arrives.
+        Returns the list of new complete lines.
+        """
+        data = self._partial + data
+        parts = data.split(b"\n")
+        self._partial = parts.pop()
+        new_lines = [p.decode("utf-8", errors="ignore").rstrip("\r") for p in parts]
+        self.lines.extend(new_lines)
+        for callback in self._listeners:
+            try:
+                callback(new_lines)
+            except Exception as e:
+                logging.error(f"Log listener error: {str(e)}")
+        return new_lines
+
+    def poll(self):
+        """
+        Read whatever was appended since the last poll.
+        Returns the list of new complete lines (empty if nothing changed
+        or the file does not exist).
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return []
+
+            # Rotated (new inode) or truncated (shrunk below our offset): start over
+            if self._inode is not None and (st.st_ino != self._inode or st.st_size < self._offset):
+                self._reset()
+
+            if self._inode is not None and st.st_size == self._offset:
+                return []
+
+            # Bounded like the ring so a large backlog stays cheap on memory
+            new_lines = deque(maxlen=self.max_lines)
+            with open(self.path, "rb") as f:
+                if self._inode is None:
+                    # Cold start (first poll, rotation, truncation): only the
+                    # tail that fits in the ring is worth reading
+                    data, _ = _read_tail_bytes(f, self.max_lines, st.st_size)
+                    new_lines.extend(self._consume(data))
+                    self._offset = st.st_size
+                f.seek(self._offset)
+                while True:
+                    chunk = f.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    new_lines.extend(self._consume(chunk))
+                self._offset = f.tell()
+            self._inode = st.st_ino
+            return list(new_lines)
+
+    def truncate_consumed(self):
+        """
+        Empty the file if everything in it has already been read, so a log
+        a writer keeps appending to can be cut back without losing output.
+        Returns False (and leaves the file alone) if bytes arrived since the
+        last poll; poll again and retry.
+        """
+        with self._lock:
+            try:
+                with open(self.path, "r+b") as f:
+                    st = os.fstat(f.fileno())
+                    if st.st_ino != self._inode or st.st_size != self._offset:
+                        return False
+                    f.truncate(0)
+            except OSError:
+                return False
+            # The ring and any unterminated fragment stay; reading resumes at the start
+            self._offset = 0
+            return True
+
+    def partial_line(self):
+        """
+        Return the trailing fragment that has no newline yet (e.g. a progress bar being redrawn).
+        """
+        with self._lock:
+            return self._partial.decode("utf-8", errors="ignore")
+
+    def recent(self, n=None):
+        """
+        Return up to the last n complete lines (all buffered lines if n is None).
+        Does not touch the file; call poll() first for fresh data.
+        """
+        with self._lock:
+            if n is None or n >= len(self.lines):
+                return list(self.lines)
+            return list(self.lines)[-n:]
+
+
+_followers = {}
+_followers_lock = threading.Lock()
+
+
+def get_follower(path, max_lines=1000):
+    """
+    Return the shared LogFollower for a path, creating it on first use.
+    """
+    with _followers_lock:
+        follower = _followers.get(path)
+        if follower is None:
+            follower = LogFollower(path, max_lines=max_lines)
+            _followers[path] = follower
+        return follower
@@ -0,0 +1,202 @@
+import time
+import logging
+import threading
+from collections import deque
+
+# Telegram rejects message texts longer than this
+MAX_TEXT_LENGTH = 4096
+
+
+def retry_after(exc):
+    """
+    Seconds Telegram asked us to wait if exc is a Bot API 429, else None.
+    """
+    if getattr(exc, "error_code", None) != 429:
+        return None
+    result = getattr(exc, "result_json", None) or {}
+    try:
+        return float(result.get("parameters", {}).get("retry_after", 1))
+    except (TypeError, ValueError, AttributeError):
+        return 1.0
+
+
+class Message:
+    """
+    One queued message and its delivery attempts.
+    """
+
+    def __init__(self, text, kwargs, coalesce):
+        self.text = text
+        self.kwargs = kwargs
+        # Plain alerts (no options besides a keyboard) may be merged
+        self.mergeable = coalesce and set(kwargs) <= {"reply_markup"}
+        self.posted = time.monotonic()
+        self.attempts = 0
+
+
+class Chat:
+    """
+    Per-chat queue and send clock.
+    """
+
+    def __init__(self):
+        self.pending = deque()
+        self.next_allowed = 0.0
+
+
+class Outbox:
+    """
+    One outbound queue for messages the bot raises on its own (alerts).
+    post() only enqueues, so the thread raising an alert never waits on
+    Telegram; a single sender thread delivers them, in order per chat.
+    - plain alerts posted to a chat within `window` seconds of the first
+      are merged into one message (a keyboard ends the merged message)
+    - a chat gets at most one message every `min_interval` seconds
+    - a 429 pauses the chat for Telegram's retry_after and retries
+    - other failures are retried with backoff, then dropped and logged
+    """
+
+    def __init__(self, send, min_interval=1.0, window=3.0, max_attempts=5, max_pending=100):
+        # send(chat_id, text, **kwargs), raising on failure
+        self.send = send
+        self.min_interval = min_interval
+        self.window = window
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self._chats = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.rate_limited = 0
+
+    def post(self, chat_id, text, coalesce=True, **kwargs):
+        """
+        Queue a message for chat_id and return at once.
+        kwargs are passed through to send(); with coalesce=False the
+        message is always sent on its own.
+        """
+        with self._cond:
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = Chat()
+            if len(chat.pending) >= self.max_pending:
+                chat.pending.popleft()
+                self.dropped += 1
+                logging.error(f"Outbox for chat {chat_id} full, dropped oldest message")
+            chat.pending.append(Message(text, kwargs, coalesce))
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return sum(len(chat.pending) for chat in self._chats.values())
+
+    def _batch(self, chat):
+        """
+        Return (messages, closed): the run of messages at the head of the
+        queue that go out as one, and whether nothing more can join it.
+        """
+        head = chat.pending[0]
+        if not head.mergeable:
+            return [head], True
+        batch = []
+        length = 0
+        for message in chat.pending:
+            if not message.mergeable or (batch and length + len(message.text) + 1 > MAX_TEXT_LENGTH):
+                return batch, True
+            batch.append(message)
+            length += len(message.text) + 1
+            if "reply_markup" in message.kwargs:
+                return batch, True
+        return batch, False
+
+    def _ready_at(self, chat):
+        # Caller holds self._cond
+        batch, closed = self._batch(chat)
+        ready = chat.next_allowed
+        if not closed:
+            ready = max(ready, batch[0].posted + self.window)
+        return ready, batch
+
+    def _next_send(self):
+        """
+        Pick the chat whose next batch is due soonest.
+        Returns (delay, chat_id, batch); chat_id is None when nothing is queued.
+        """
+        now = time.monotonic()
+        best = (None, None, None)
+        for chat_id, chat in self._chats.items():
+            if not chat.pending:
+                continue
+            ready, batch = self._ready_at(chat)
+            if best[0] is None or ready < best[0]:
+                best = (ready, chat_id, batch)
+        if best[0] is None:
+            return None, None, None
+        return max(0.0, best[0] - now), best[1], best[2]
+
+    def _deliver(self, chat_id, batch):
+        texts = []
+        for message in batch:
+            # The same alert raised twice in one window is sent once
+            if message.text not in texts:
+                texts.append(message.text)
+        kwargs = batch[-1].kwargs
+        try:
+            self.send(chat_id, "\n".join(texts), **kwargs)
+            return None
+        except Exception as e:
+            return e
+
+    def _discard(self, chat, batch):
+        # Caller holds self._cond. post() may have dropped some of the
+        # batch from a full queue while it was being sent
+        for message in batch:
+            if message in chat.pending:
+                chat.pending.remove(message)
+
+    def run(self):
+        """
+        Deliver queued messages in the calling thread until the interpreter exits.
+        """
+        while True:
+            with self._cond:
+                delay, chat_id, batch = self._next_send()
+                if chat_id is None or delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            error = self._deliver(chat_id, batch)
+            now = time.monotonic()
+            with self._cond:
+                chat = self._chats[chat_id]
+                if error is None:
+                    self._discard(chat, batch)
+                    self.sent += 1
+                    self.merged += len(batch) - 1
+                    chat.next_allowed = now + self.min_interval
+                    continue
+                wait = retry_after(error)
+                if wait is not None:
+                    self.rate_limited += 1
+                    logging.error(f"Telegram rate limit for chat {chat_id}, retrying in {wait:.0f}s")
+                    chat.next_allowed = now + wait
+                    continue
+                head = batch[0]
+                head.attempts += 1
+                if head.attempts >= self.max_attempts:
+                    self._discard(chat, batch)
+                    self.dropped += len(batch)
+                    logging.error(f"Dropping message to chat {chat_id} after {head.attempts} attempts: {str(error)}")
+                    chat.next_allowed = now + self.min_interval
+                else:
+                    chat.next_allowed = now + min(2 ** head.attempts, 60)
+                    logging.error(f"Send to chat {chat_id} failed, retrying: {str(error)}")
+
+    def start(self):
+        """
+        Run the sender loop in a daemon thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="outbox", daemon=True)
+            self._thread.start()
@@ -1,12 +1,13 @@
 import os
-import time
-import json
 import html
-import requests
+import http_client
 import subprocess
-from web3 import Web3
-from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
 from dotenv import load_dotenv
+from logtail import tail_lines
+from eoa import EoaCache, resolve_eoas_multi, ZERO_ADDRESS
+from scheduler import Scheduler
 
 # Load only TOKEN and CHAT ID from env file
 load_dotenv("/root/bot_config.env")
@@ -20,20 +21,28 @@ DELAY_SECONDS = 1800
 SCREEN_NAME = "gensyn"
 NODE_NO = "1"
 
-ALCHEMY_RPC = "https://gensyn-testnet.g.alchemy.com/v2/TD5tr7mo4VfXlSaolFlSr3tL70br2M9J"
+# Peers are fetched concurrently; a report goes out with whatever arrived by the deadline
+FETCH_WORKERS = 8
+FETCH_DEADLINE_SECONDS = 30
+# Two attempts plus the wait between them stay inside the deadline
+# (2 x (4s connect + 8s read) + 5s), so a stuck peer frees its worker by then
+FETCH_TIMEOUT = (4, 8)
+FETCH_RETRIES = 1
+FETCH_MAX_DELAY = 5
+
 CONTRACT_ADDRESS = "0x69C6e1D608ec64885E7b185d39b04B491a71768C"
-ABI = [
-    {
-        "name": "getEoa",
-        "type": "function",
-        "stateMutability": "view",
-        "inputs": [{"name": "peerIds", "type": "string[]"}],
-        "outputs": [{"name": "", "type": "address[]"}]
-    }
-]
+# Contracts a peer may be registered in (bot.py uses the second), in order of preference.
+# All of them are queried in one batched RPC round-trip.
+CONTRACT_ADDRESSES = [CONTRACT_ADDRESS, "0xFaD7C5e93f28257429569B854151A1B8DCD404c2"]
 
 EOA_CACHE_FILE = "eoa_cache.json"
 
+# Telegram 429s (and 5xx) on a report are retried after the wait it asks for
+SEND_RETRIES = 3
+
+# Reports must be current, so expired entries are revalidated (ETag) rather than served stale
+peer_cache = http_client.JsonCache(ttl=60, max_stale=0)
+
 def send_telegram_message(token, chat_id, message: str):
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {
@@ -42,7 +51,8 @@ def send_telegram_message(token, chat_id, message: str):
         "parse_mode": "HTML",
         "disable_web_page_preview": True
     }
-    return requests.post(url, json=payload)
+    # A 429 means nothing was sent, so it is safe to wait retry_after and resend
+    return http_client.post(url, json=payload, retries=SEND_RETRIES)
 
 def log_message(message: str):
     log_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -53,9 +63,7 @@ def get_last_screen_logs(screen_name="gensyn", lines=10):
     try:
         log_path = f"/tmp/{screen_name}_log.txt"
         subprocess.run(f"screen -S {screen_name} -X hardcopy {log_path}", shell=True, check=True)
-        with open(log_path, "rb") as f:
-            content = f.read().decode("utf-8", errors="ignore")
-        return "\n".join(content.strip().split("\n")[-lines:])
+        return "\n".join(tail_lines(log_path, lines, skip_blank=True))
     except Exception as e:
         return f"Log fetch error: {str(e)}"
 
@@ -63,80 +71,104 @@ def fetch_peer_data(peer_name):
     url_name = peer_name.replace(" ", "%20")
     url = f"https://dashboard-math.gensyn.ai/api/v1/peer?name={url_name}"
     try:
-        response = requests.get(url)
-        if response.ok:
-            return response.json()
+        return peer_cache.get_json(url, timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES,
+                                   max_delay=FETCH_MAX_DELAY)
     except:
         pass
     return None
 
-def fetch_eoa_mapping(w3, contract, peer_ids):
-    today = str(date.today())
-    if os.path.exists(EOA_CACHE_FILE):
-        with open(EOA_CACHE_FILE) as f:
-            data = json.load(f)
-            if data.get("date") == today:
-                return data.get("mapping", {})
-
-    addresses = contract.functions.getEoa(peer_ids).call()
-    mapping = {pid: eoa for pid, eoa in zip(peer_ids, addresses)}
-    with open(EOA_CACHE_FILE, "w") as f:
-        json.dump({"date": today, "mapping": mapping}, f, indent=4)
+def fetch_all_peer_data(executor, peer_names, deadline=FETCH_DEADLINE_SECONDS):
+    """
+    Fetch every peer concurrently on the worker pool.
+    Returns ([(name, data)] in peer_names order, [names that timed out]).
+    Peers whose fetch failed are left out, as before. A fetch still
+    running at the deadline is not interrupted; its own timeouts end it.
+    """
+    futures = {name: executor.submit(fetch_peer_data, name.strip()) for name in peer_names}
+    wait(futures.values(), timeout=deadline)
+    results = []
+    timed_out = []
+    for name, future in futures.items():
+        if not future.done():
+            timed_out.append(name)
+            continue
+        data = future.result()
+        if data:
+            results.append((name, data))
+    return results, timed_out
+
+def fetch_eoa_mapping(cache, peer_ids):
+    per_contract = resolve_eoas_multi(cache, CONTRACT_ADDRESSES, peer_ids)
+    mapping = {}
+    for pid in peer_ids:
+        candidates = [per_contract[address].get(pid) for address in CONTRACT_ADDRESSES]
+        registered = [eoa for eoa in candidates if eoa and eoa != ZERO_ADDRESS]
+        mapping[pid] = registered[0] if registered else candidates[0]
     return mapping
 
-def main():
-    w3 = Web3(Web3.HTTPProvider(ALCHEMY_RPC))
-    contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=ABI)
+def send_report(eoa_cache, executor):
+    """
+    Build and send one peer report
+    """
+    try:
+        messages = []
+        peer_infos, timed_out = fetch_all_peer_data(executor, PEER_NAMES)
+        peer_ids = [info["peerId"] for _, info in peer_infos]
 
-    while True:
         try:
-            messages = []
-            peer_infos = []
-            peer_ids = []
-
-            for name in PEER_NAMES:
-                data = fetch_peer_data(name.strip())
-                if data:
-                    peer_infos.append((name, data))
-                    peer_ids.append(data["peerId"])
-
-            eoa_map = fetch_eoa_mapping(w3, contract, peer_ids)
-
-            for i, (name, info) in enumerate(peer_infos):
-                peer_id = info["peerId"]
-                eoa = eoa_map.get(peer_id, "N/A")
-                explorer_link = f"https://gensyn-testnet.explorer.alchemy.com/address/{eoa}?tab=internal_txns"
-                status = "🟢 Online" if info["online"] else "🔴 Offline"
-
-                msg = (
-                    f"<b>Peer {NODE_NO}</b>\n"
-                    f"Name: <code>{name}</code>\n"
-                    f"Peer ID: <code>{peer_id}</code>\n"
-                    f"EOA: <code>{eoa}</code>\n"
-                    f"Total Reward: {info['reward']}\n"
-                    f"Total Wins: {info['score']}\n"
-                    f"Status: {status}\n"
-                    f'<a href="{explorer_link}">View on Explorer</a>'
-                )
-                messages.append(msg)
-
-            logs = get_last_screen_logs(SCREEN_NAME)
-            full_message = "\n\n".join(messages) + f"\n\n<b>Last Logs:</b>\n<code>{html.escape(logs)}</code>"
-
-            response = send_telegram_message(TELEGRAM_API_TOKEN, CHAT_ID, full_message)
-            log_message(full_message)
-
-            if response.ok:
-                print(f"✅ Message sent at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            else:
-                print("❌ Telegram send error:", response.text)
-
+            eoa_map = fetch_eoa_mapping(eoa_cache, peer_ids)
         except Exception as e:
-            err = f"⚠️ Error:\n<code>{html.escape(str(e))}</code>"
-            send_telegram_message(TELEGRAM_API_TOKEN, CHAT_ID, err)
-            log_message(err)
+            # Still send the peer stats; EOAs show as N/A this cycle
+            print("⚠️ EOA lookup error:", e)
+            eoa_map = {}
+
+        for i, (name, info) in enumerate(peer_infos):
+            peer_id = info["peerId"]
+            eoa = eoa_map.get(peer_id, "N/A")
+            explorer_link = f"https://gensyn-testnet.explorer.alchemy.com/address/{eoa}?tab=internal_txns"
+            status = "🟢 Online" if info["online"] else "🔴 Offline"
+
+            msg = (
+                f"<b>Peer {NODE_NO}</b>\n"
+                f"Name: <code>{name}</code>\n"
+                f"Peer ID: <code>{peer_id}</code>\n"
+                f"EOA: <code>{eoa}</code>\n"
+                f"Total Reward: {info['reward']}\n"
+                f"Total Wins: {info['score']}\n"
+                f"Status: {status}\n"
+                f'<a href="{explorer_link}">View on Explorer</a>'
+            )
+            messages.append(msg)
+
+        if timed_out:
+            names = ", ".join(f"<code>{html.escape(name)}</code>" for name in timed_out)
+            messages.append(f"⏳ No response within {FETCH_DEADLINE_SECONDS}s: {names}")
+
+        logs = get_last_screen_logs(SCREEN_NAME)
+        full_message = "\n\n".join(messages) + f"\n\n<b>Last Logs:</b>\n<code>{html.escape(logs)}</code>"
+
+        response = send_telegram_message(TELEGRAM_API_TOKEN, CHAT_ID, full_message)
+        log_message(full_message)
+
+        if response.ok:
+            print(f"✅ Message sent at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        else:
+            print("❌ Telegram send error:", response.text)
 
-        time.sleep(DELAY_SECONDS)
+    except Exception as e:
+        err = f"⚠️ Error:\n<code>{html.escape(str(e))}</code>"
+        send_telegram_message(TELEGRAM_API_TOKEN, CHAT_ID, err)
+        log_message(err)
+
+def main():
+    eoa_cache = EoaCache(EOA_CACHE_FILE, legacy_contract=CONTRACT_ADDRESS)
+    executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+
+    # One report now, then every DELAY_SECONDS after the previous one finished
+    scheduler = Scheduler(workers=1)
+    scheduler.add("reward_report", send_report, DELAY_SECONDS, jitter=0.02,
+                  timeout=FETCH_DEADLINE_SECONDS * 4, delay=0, args=(eoa_cache, executor))
+    scheduler.run()
 
 if __name__ == "__main__":
     main()
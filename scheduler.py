@@ -0,0 +1,216 @@
+import time
+import heapq
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+def gather(executor, calls, deadline):
+    """
+    Run each zero-argument callable in `calls` ({name: func}) on executor
+    and wait until all have finished or `deadline` seconds have passed,
+    whichever comes first.
+    Returns ({name: result}, {name: exception}, [names still running]).
+    """
+    futures = {executor.submit(func): name for name, func in calls.items()}
+    done, pending = wait(futures, timeout=deadline)
+    results = {}
+    errors = {}
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = e
+    return results, errors, [futures[future] for future in pending]
+
+
+class Job:
+    """
+    One registered job and its run statistics.
+    """
+
+    def __init__(self, name, func, interval, jitter, timeout, max_backoff, args, once=False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.max_backoff = max_backoff if max_backoff is not None else interval * 10
+        self.args = args
+        self.once = once
+        self.cancelled = False
+        self.next_run = None
+        self.running_since = None
+        self.timed_out = False
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.last_duration = None
+        self.last_error = None
+
+
+class Scheduler:
+    """
+    Heap-ordered scheduler for periodic checks.
+    Each job has its own interval, jitter, timeout and failure backoff and
+    runs on a small worker pool, so a slow job never delays the others.
+    A job never overlaps itself: its next run is only scheduled once the
+    current one has finished, counting its interval from then. Python threads
+    cannot be killed, so a job past its timeout is logged and counted
+    rather than aborted; jobs should bound their own I/O.
+    """
+
+    def __init__(self, workers=4):
+        self._heap = []
+        self._jobs = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler")
+        self._thread = None
+
+    def _push(self, job, delay):
+        # Caller holds self._cond
+        if job.jitter and delay > 0:
+            delay *= 1 + random.uniform(-job.jitter, job.jitter)
+        job.next_run = time.monotonic() + max(0, delay)
+        self._seq += 1
+        heapq.heappush(self._heap, (job.next_run, self._seq, job))
+        self._cond.notify()
+
+    def _register(self, job, delay):
+        with self._cond:
+            old = self._jobs.get(job.name)
+            if old is not None:
+                old.cancelled = True
+            self._jobs[job.name] = job
+            self._push(job, job.interval if delay is None else delay)
+
+    def add(self, name, func, interval, jitter=0.1, timeout=None, max_backoff=None, delay=None, args=()):
+        """
+        Register (or replace) a job that calls func(*args) every `interval`
+        seconds, measured from the end of the previous run, give or take
+        `jitter` (a fraction of the delay). The first run is after `delay`
+        seconds (default: one interval).
+        If func raises, its next run backs off exponentially up to
+        max_backoff (default 10x the interval). If it returns a number, that
+        is used as the delay until its next run instead.
+        """
+        self._register(Job(name, func, interval, jitter, timeout, max_backoff, args), delay)
+
+    def run_once(self, name, func, delay, timeout=None, args=()):
+        """
+        Register (or replace) a job that calls func(*args) once after `delay` seconds.
+        """
+        self._register(Job(name, func, delay, 0, timeout, None, args, once=True), delay)
+
+    def remove(self, name):
+        """
+        Cancel a job. A run already in progress finishes but is not rescheduled.
+        Returns True if the job was registered.
+        """
+        with self._cond:
+            job = self._jobs.pop(name, None)
+            if job is None:
+                return False
+            job.cancelled = True
+            return True
+
+    def has(self, name):
+        with self._cond:
+            return name in self._jobs
+
+    def status(self):
+        """
+        Return a snapshot of every registered job's schedule and counters.
+        """
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "name": job.name,
+                    "interval": job.interval,
+                    "next_in": max(0.0, job.next_run - now) if job.next_run is not None else None,
+                    "running_for": now - job.running_since if job.running_since is not None else None,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "timeouts": job.timeouts,
+                    "last_duration": job.last_duration,
+                    "last_error": job.last_error,
+                }
+                for job in sorted(self._jobs.values(), key=lambda j: j.name)
+            ]
+
+    def _run(self, job):
+        start = time.monotonic()
+        result = None
+        failed = False
+        try:
+            result = job.func(*job.args)
+        except Exception as e:
+            failed = True
+            job.last_error = str(e)
+            logging.error(f"Job {job.name} failed: {str(e)}")
+        with self._cond:
+            job.running_since = None
+            job.runs += 1
+            job.last_duration = time.monotonic() - start
+            if failed:
+                job.failures += 1
+            else:
+                job.failures = 0
+                job.last_error = None
+            if job.cancelled or job.once:
+                if self._jobs.get(job.name) is job:
+                    del self._jobs[job.name]
+                return
+            if isinstance(result, (int, float)) and not isinstance(result, bool):
+                delay = result
+            elif failed:
+                delay = min(job.interval * (2 ** job.failures), job.max_backoff)
+            else:
+                delay = job.interval
+            self._push(job, delay)
+
+    def _check_timeouts(self, now):
+        # Caller holds self._cond
+        for job in self._jobs.values():
+            if job.running_since is None or job.timeout is None or job.timed_out:
+                continue
+            if now - job.running_since > job.timeout:
+                job.timed_out = True
+                job.timeouts += 1
+                logging.error(f"Job {job.name} still running after {job.timeout}s")
+
+    def run(self):
+        """
+        Run the scheduling loop in the calling thread until the interpreter exits.
+        """
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                self._check_timeouts(now)
+                if not self._heap or self._heap[0][0] > now:
+                    timeout = self._heap[0][0] - now if self._heap else 1.0
+                    # Wake at least once a second to notice overdue jobs
+                    self._cond.wait(min(timeout, 1.0))
+                    continue
+                _, _, job = heapq.heappop(self._heap)
+                if job.cancelled:
+                    continue
+                job.running_since = now
+                job.timed_out = False
+            try:
+                self._executor.submit(self._run, job)
+            except RuntimeError:
+                # Executor shut down: the interpreter is exiting
+                return
+
+    def start(self):
+        """
+        Run the scheduling loop in a daemon thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="scheduler", daemon=True)
+            self._thread.start()
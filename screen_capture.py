@@ -0,0 +1,248 @@
+import os
+import re
+import pwd
+import hashlib
+import logging
+import threading
+import subprocess
+from collections import deque
+
+from logtail import LogFollower
+
+# Escape sequences that only style or move the cursor in a terminal
+ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]")
+
+
+def clean_terminal_line(line):
+    """
+    Reduce one raw terminal output line to what is left visible on screen:
+    escape sequences are dropped and carriage returns (progress bars,
+    spinners) keep only the last overwrite.
+    """
+    line = ANSI_RE.sub("", line)
+    if "\r" in line:
+        segments = [s for s in line.split("\r") if s]
+        line = segments[-1] if segments else ""
+    return line.replace("\x07", "").rstrip()
+
+
+def screen_socket_dir():
+    """
+    Return the directory holding screen's session sockets, or None.
+    """
+    env_dir = os.environ.get("SCREENDIR")
+    if env_dir:
+        return env_dir if os.path.isdir(env_dir) else None
+    user = pwd.getpwuid(os.getuid()).pw_name
+    for path in (f"/run/screen/S-{user}", f"/var/run/screen/S-{user}", os.path.expanduser("~/.screen")):
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def find_screen_session(session_name):
+    """
+    Return the "pid.name" id of a live screen session, or None.
+    Reads screen's socket directory instead of running `screen -ls`, and
+    skips sockets left behind by dead sessions.
+    Falls back to `screen -ls` when the socket directory is unknown.
+    """
+    socket_dir = screen_socket_dir()
+    if socket_dir is None:
+        try:
+            result = subprocess.run("screen -ls", shell=True, capture_output=True, text=True)
+        except Exception:
+            return None
+        for line in result.stdout.split("\n"):
+            parts = line.strip().split()
+            if parts and parts[0].endswith(f".{session_name}"):
+                return parts[0]
+        return None
+    try:
+        entries = os.listdir(socket_dir)
+    except OSError:
+        return None
+    for entry in entries:
+        pid, _, name = entry.partition(".")
+        if name != session_name or not pid.isdigit():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            continue
+        except PermissionError:
+            pass
+        return entry
+    return None
+
+
+class ScreenCapture:
+    """
+    Continuous capture of a screen session's output.
+    screen's own logfile mode is switched on once per session, and the log
+    is followed incrementally into a bounded in-memory terminal buffer, so
+    reading the current screen contents or the scrollback needs no
+    subprocess and no temp file.
+    """
+
+    def __init__(self, session_name, logfile, scrollback=2000, max_log_bytes=20 * 1024 * 1024):
+        self.session_name = session_name
+        self.logfile = logfile
+        self.max_log_bytes = max_log_bytes
+        self.buffer = deque(maxlen=scrollback)
+        self._follower = LogFollower(logfile, max_lines=scrollback)
+        self._follower.subscribe(self._on_lines)
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _on_lines(self, lines):
+        self.buffer.extend(clean_terminal_line(line) for line in lines)
+
+    def _enable_logging(self, session_id):
+        for cmd in (
+            f"logfile {self.logfile}",
+            "logfile flush 1",
+            "log on",
+        ):
+            subprocess.run(["screen", "-S", session_id, "-X"] + cmd.split(" "), capture_output=True)
+
+    def refresh(self):
+        """
+        Make sure the current session is logging and pull in new output.
+        Returns the session id, or None if the session is not running.
+        """
+        with self._lock:
+            session_id = find_screen_session(self.session_name)
+            if session_id is None:
+                self._session = None
+                return None
+            if session_id != self._session:
+                try:
+                    self._enable_logging(session_id)
+                    self._session = session_id
+                except Exception as e:
+                    logging.error(f"Error enabling screen log: {str(e)}")
+            self._follower.poll()
+            # screen appends to the log, so it can be cut back once consumed;
+            # output written after the poll is read first, then the cut retried
+            try:
+                if os.path.getsize(self.logfile) > self.max_log_bytes:
+                    for _ in range(3):
+                        if self._follower.truncate_consumed():
+                            break
+                        self._follower.poll()
+            except OSError:
+                pass
+            return session_id
+
+    def lines(self, n=None):
+        """
+        Return the last n captured lines (including a line still being drawn).
+        """
+        lines = list(self.buffer)
+        partial = clean_terminal_line(self._follower.partial_line())
+        if partial:
+            lines.append(partial)
+        return lines if n is None else lines[-n:]
+
+    def snapshot(self, rows=24):
+        """
+        Return the last `rows` lines as text, or None if the session is not
+        running or nothing has been captured yet.
+        """
+        if self.refresh() is None:
+            return None
+        text = "\n".join(self.lines(rows)).strip("\n")
+        return text or None
+
+
+# Tokens that change without the process making progress: timestamps,
+# clocks, percentages, progress bars, rates, elapsed/ETA and spinners
+VOLATILE_RE = re.compile(
+    r"\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:[.,]\d+)?"
+    r"|\b\d{1,2}:\d\d(?::\d\d)?\b"
+    r"|\d+(?:\.\d+)?\s*%"
+    r"|\|[#█▉▊▋▌▍▎▏=>\- ]*\|"
+    r"|\d+(?:\.\d+)?\s*(?:it/s|s/it|[kMG]?B/s)"
+    r"|\[[\d:]+<[\d:?]+[^\]]*\]"
+    r"|[⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏◐◓◑◒]"
+)
+
+
+def normalize_screen_line(line):
+    """
+    Replace volatile tokens so cosmetic redraws hash the same.
+    """
+    return VOLATILE_RE.sub("#", line).strip()
+
+
+class FreezeDetector:
+    """
+    Decides whether a screen has stopped making progress.
+    Each observation splits the normalized screen into a few regions and
+    keeps only one short digest per region, plus a bounded time series of
+    the fraction of regions that changed, so memory use stays constant.
+    """
+
+    def __init__(self, regions=4, history=1440):
+        self.regions = regions
+        self.samples = deque(maxlen=history)
+        self.last_change = None
+        self._digests = None
+
+    def _region_digests(self, text):
+        lines = [normalize_screen_line(line) for line in text.split("\n")]
+        lines = [line for line in lines if line]
+        size = max(1, -(-len(lines) // self.regions))
+        digests = []
+        for i in range(self.regions):
+            chunk = "\n".join(lines[i * size:(i + 1) * size])
+            digests.append(hashlib.blake2b(chunk.encode("utf-8", errors="ignore"), digest_size=8).digest())
+        return digests
+
+    def observe(self, text, now):
+        """
+        Record one observation of the screen at `now` (a datetime).
+        Returns the fraction of regions that changed meaningfully.
+        """
+        digests = self._region_digests(text or "")
+        if self._digests is None:
+            changed = 1.0
+        else:
+            changed = sum(1 for old, new in zip(self._digests, digests) if old != new) / self.regions
+        self._digests = digests
+        if changed or self.last_change is None:
+            self.last_change = now
+        self.samples.append((now, changed))
+        return changed
+
+    def frozen_for(self, now):
+        """
+        Time since the last meaningful change (timedelta), or None before the first observation.
+        """
+        if self.last_change is None:
+            return None
+        return now - self.last_change
+
+    def change_rate(self, since):
+        """
+        Fraction of observations since `since` that saw a meaningful change, or None.
+        """
+        window = [changed for ts, changed in self.samples if ts >= since]
+        if not window:
+            return None
+        return sum(1 for changed in window if changed) / len(window)
+
+    def restart_clock(self, now):
+        """
+        Treat `now` as the last change, e.g. after alerting, so alerts do not repeat every check.
+        """
+        self.last_change = now
+
+    def reset(self):
+        """
+        Forget all observations, e.g. when the session goes away.
+        """
+        self.samples.clear()
+        self.last_change = None
+        self._digests = None
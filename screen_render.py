@@ -0,0 +1,131 @@
+import io
+import logging
+import threading
+from collections import OrderedDict
+
+DEFAULT_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf"
+
+
+class ScreenRenderer:
+    """
+    Renders terminal text to a PNG in memory.
+    PIL and the font are loaded once, each distinct line is rasterized once
+    into a cached glyph mask, and the canvas from the previous render is
+    kept so only rows whose text changed are redrawn. Rendering the same
+    screen twice returns the previous PNG without touching PIL at all.
+    """
+
+    def __init__(self, font_path=DEFAULT_FONT, font_size=14, line_height=18, padding=20,
+                 bg_color=(0, 0, 0), text_color=(0, 255, 0), max_cached_lines=512, column_step=20):
+        self.font_path = font_path
+        self.font_size = font_size
+        self.line_height = line_height
+        self.padding = padding
+        self.char_width = font_size - 4
+        self.bg_color = bg_color
+        self.text_color = text_color
+        self.max_cached_lines = max_cached_lines
+        # Canvas width grows in steps of this many columns, so a slightly
+        # longer line does not force a full redraw
+        self.column_step = column_step
+        self._font = None
+        self._line_masks = OrderedDict()
+        self._canvas = None
+        self._rows = []
+        self._png = None
+        self._lock = threading.Lock()
+
+    def _get_font(self):
+        if self._font is None:
+            from PIL import ImageFont
+            try:
+                self._font = ImageFont.truetype(self.font_path, self.font_size)
+            except Exception:
+                self._font = ImageFont.load_default()
+        return self._font
+
+    def warm_up(self):
+        """
+        Import PIL and load the font ahead of the first render.
+        """
+        with self._lock:
+            self._get_font()
+
+    def _line_mask(self, line):
+        """
+        Return the cached 8-bit mask for one line of text, rasterizing it on first use.
+        """
+        mask = self._line_masks.get(line)
+        if mask is not None:
+            self._line_masks.move_to_end(line)
+            return mask
+        from PIL import Image, ImageDraw
+        width = max(1, len(line) * self.char_width + self.char_width)
+        mask = Image.new("L", (width, self.line_height), 0)
+        ImageDraw.Draw(mask).text((0, 0), line, fill=255, font=self._get_font())
+        self._line_masks[line] = mask
+        if len(self._line_masks) > self.max_cached_lines:
+            self._line_masks.popitem(last=False)
+        return mask
+
+    def _new_canvas(self, size):
+        """
+        Palette canvas whose index is the glyph coverage: index 0 is the
+        background, 255 the text colour, and the rest the blend in between.
+        A one-byte-per-pixel image encodes far faster than RGB.
+        """
+        from PIL import Image
+        canvas = Image.new("P", size, 0)
+        palette = []
+        for i in range(256):
+            palette.extend(bg + (fg - bg) * i // 255 for bg, fg in zip(self.bg_color, self.text_color))
+        canvas.putpalette(palette)
+        return canvas
+
+    def _canvas_size(self, lines):
+        columns = max((len(line) for line in lines), default=80)
+        columns = -(-max(columns, 1) // self.column_step) * self.column_step
+        return (columns * self.char_width + self.padding * 2,
+                len(lines) * self.line_height + self.padding * 2)
+
+    def _draw_row(self, row, line):
+        x = self.padding
+        y = self.padding + row * self.line_height
+        width = self._canvas.size[0] - self.padding
+        self._canvas.paste(0, (x, y, width, y + self.line_height))
+        if line:
+            mask = self._line_mask(line)
+            # Masks may be wider than the canvas row; crop to what fits
+            if mask.size[0] > width - x:
+                mask = mask.crop((0, 0, width - x, self.line_height))
+            self._canvas.paste(255, (x, y), mask)
+
+    def render(self, text):
+        """
+        Return the screen text as PNG bytes, or None if there is nothing to render.
+        """
+        if not text:
+            return None
+        lines = text.split("\n")
+        with self._lock:
+            if lines == self._rows and self._png is not None:
+                return self._png
+            try:
+                size = self._canvas_size(lines)
+                if self._canvas is None or self._canvas.size != size:
+                    self._canvas = self._new_canvas(size)
+                    self._rows = []
+                for row, line in enumerate(lines):
+                    if row >= len(self._rows) or self._rows[row] != line:
+                        self._draw_row(row, line)
+                self._rows = lines
+                buffer = io.BytesIO()
+                self._canvas.save(buffer, format="PNG", compress_level=3)
+                self._png = buffer.getvalue()
+                return self._png
+            except Exception as e:
+                logging.error(f"Error rendering screen image: {str(e)}")
+                self._canvas = None
+                self._rows = []
+                self._png = None
+                return None
@@ -1,8 +1,8 @@
 import os
 import asyncio
 import socket
+import importlib
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 import telebot
 
 load_dotenv("/root/bot_config.env")
@@ -48,10 +48,15 @@ async def main():
         if os.path.exists(path):
             open(path, 'w').close()
 
+    # Import playwright in the background while waiting for the login page
+    loop = asyncio.get_event_loop()
+    playwright_import = loop.run_in_executor(None, importlib.import_module, "playwright.async_api")
+
     if not await wait_for_port("localhost", 3000, 180):
         await send_async_message("❌ Timeout waiting for localhost:3000 - Check if Gensyn is running")
         return
 
+    async_playwright = (await playwright_import).async_playwright
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         context = await browser.new_context()
@@ -0,0 +1,432 @@
+import os
+import re
+import time
+import struct
+import bisect
+import calendar
+import threading
+from array import array
+from collections import namedtuple
+from datetime import datetime
+
+# Event kinds
+JOIN = 1      # "Joining round: N"
+START = 2     # "Starting round: N/M"
+STAGE = 3     # "Training round: N stage: S"
+HELLO = 4     # "Hello ... [peer name] ... [peer id]"
+ERROR = 5     # any ERROR/CRITICAL line
+
+KIND_NAMES = {JOIN: "join", START: "start", STAGE: "stage", HELLO: "hello", ERROR: "error"}
+
+LEVELS = ["", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+LEVEL_CODES = {name: code for code, name in enumerate(LEVELS)}
+
+SwarmEvent = namedtuple("SwarmEvent", "ts level kind round stage peer_name peer_id")
+
+# Result of classify_line(); kind is 0 for lines that are not a tracked event
+LogLine = namedtuple("LogLine", "ts level kind round total stage peer_name peer_id msg")
+
+# One alternation covering every tracked message kind, tried only on lines
+# that could contain one of them
+KIND_RE = re.compile(
+    r"Joining round:?\s*(?P<join>\d+)"
+    r"|Starting round:?\s*(?P<start>\d+)(?:/(?P<total>\d+))?"
+    r"|round:?\s*(?P<sround>\d+)\D+stage:?\s*(?P<stage>\d+)"
+    r"|Hello[^\[]*\[(?P<name>[^\]]+)\][^\[]*\[(?P<pid>[^\]]+)\]"
+)
+
+_day_epoch = {}
+# Consecutive log lines usually share the same second
+_last_second = ("", 0)
+
+
+def to_epoch(value):
+    """
+    Convert a naive UTC datetime (as used throughout the bot) or epoch float to epoch seconds.
+    """
+    if isinstance(value, datetime):
+        return calendar.timegm(value.timetuple()) + value.microsecond / 1e6
+    return float(value)
+
+
+def parse_log_timestamp(s):
+    """
+    Parse the fixed "%Y-%m-%d %H:%M:%S,mmm" log format into UTC epoch seconds.
+    Midnight of each date and the last whole second seen are cached, so most
+    calls are a slice compare and one int(). Returns None if the text is not
+    in that format.
+    """
+    global _last_second
+    if len(s) != 23 or s[4] != "-" or s[10] != " " or s[19] != ",":
+        return None
+    try:
+        second = s[:19]
+        cached_second, cached_base = _last_second
+        if second == cached_second:
+            return cached_base + int(s[20:23]) / 1000
+        day = s[:10]
+        base = _day_epoch.get(day)
+        if base is None:
+            if len(_day_epoch) > 1024:
+                _day_epoch.clear()
+            base = calendar.timegm((int(s[0:4]), int(s[5:7]), int(s[8:10]), 0, 0, 0, 0, 0, 0))
+            _day_epoch[day] = base
+        base += int(s[11:13]) * 3600 + int(s[14:16]) * 60 + int(s[17:19])
+        _last_second = (second, base)
+        return base + int(s[20:23]) / 1000
+    except ValueError:
+        return None
+
+
+def classify_line(line):
+    """
+    Single pass over one "[ts][module][LEVEL] - message" log line.
+    Returns a LogLine with the timestamp (epoch seconds), level, event kind
+    and captured fields, or None if the line is not in the log format.
+    """
+    if len(line) < 26 or line[0] != "[" or line[24] != "]":
+        return None
+    sep = line.find("] - ", 25)
+    if sep < 0:
+        return None
+    ts = parse_log_timestamp(line[1:24])
+    if ts is None:
+        return None
+    level = line[line.rfind("[", 25, sep) + 1:sep]
+    msg = line[sep + 4:].rstrip()
+
+    if "ound" in msg or "Hello" in msg:
+        m = KIND_RE.search(msg)
+        if m:
+            join, start, total, sround, stage, name, pid = m.groups()
+            if join:
+                return LogLine(ts, level, JOIN, int(join), None, -1, None, None, msg)
+            if start:
+                return LogLine(ts, level, START, int(start), int(total) if total else None, -1, None, None, msg)
+            if sround:
+                return LogLine(ts, level, STAGE, int(sround), None, int(stage), None, None, msg)
+            name = name.strip()
+            pid = pid.strip()
+            if name and pid:
+                return LogLine(ts, level, HELLO, -1, None, -1, name, pid, msg)
+    if level == "ERROR" or level == "CRITICAL":
+        return LogLine(ts, level, ERROR, -1, None, -1, None, None, msg)
+    return LogLine(ts, level, 0, -1, None, -1, None, None, msg)
+
+
+def parse_line(line):
+    """
+    Turn one swarm_launcher.log line into a SwarmEvent, or None if the line
+    is not one of the tracked event kinds.
+    """
+    c = classify_line(line)
+    if c is None or not c.kind:
+        return None
+    return SwarmEvent(c.ts, LEVEL_CODES.get(c.level, 0), c.kind, c.round, c.stage, c.peer_name, c.peer_id)
+
+
+def _first_timestamp_after(f, offset, end, max_lines=64):
+    """
+    Timestamp of the first complete log line starting after offset, or None.
+    """
+    f.seek(offset)
+    if offset:
+        f.readline()
+    for _ in range(max_lines):
+        if f.tell() >= end:
+            break
+        line = f.readline()
+        if not line:
+            break
+        parsed = classify_line(line.decode("utf-8", errors="ignore"))
+        if parsed is not None:
+            return parsed.ts
+    return None
+
+
+def _offset_before(f, since, end, block_size=64 * 1024):
+    """
+    Binary search a time-ordered log for an offset at or before the first
+    line with a timestamp >= since, to within block_size bytes.
+    """
+    lo, hi = 0, end
+    while hi - lo > block_size:
+        mid = (lo + hi) // 2
+        ts = _first_timestamp_after(f, mid, end)
+        if ts is None or ts >= since:
+            hi = mid
+        else:
+            lo = mid
+    return lo
+
+
+class SwarmEventStore:
+    """
+    Compact append-only store of typed swarm log events.
+    Events are kept in parallel arrays ordered by time and persisted as
+    fixed-size binary records, with a per-round index of start times so
+    round questions are answered without rescanning log text.
+    The file is read on first use, not when the store is created.
+    With max_age_days, events older than that are dropped when the file
+    is read and on every compact(), and the file is rewritten without them.
+    """
+
+    # ts (float64), round (int64), stage (int32), kind (uint8), level (uint8)
+    RECORD = struct.Struct("<dqiBB")
+
+    def __init__(self, path=None, max_age_days=None):
+        self.path = path
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._ts = array("d")
+        self._round = array("q")
+        self._stage = array("i")
+        self._kind = array("B")
+        self._level = array("B")
+        # Round index: first time each round was seen starting (or joined)
+        self._round_start = {}
+        self._start_ts = array("d")
+        self._start_round = array("q")
+        self.identity = None
+        self._backfilling = False
+        self._pending = []
+        self._loaded = not path
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._ts)
+
+    def _ensure_loaded(self):
+        # Caller holds self._lock
+        if self._loaded:
+            return
+        self._loaded = True
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        size = self.RECORD.size
+        usable = len(data) - len(data) % size
+        for offset in range(0, usable, size):
+            ts, rnd, stage, kind, level = self.RECORD.unpack_from(data, offset)
+            self._append(ts, level, kind, rnd, stage)
+        if usable != len(data):
+            # Drop a record torn by a crash mid-write
+            with open(self.path, "r+b") as f:
+                f.truncate(usable)
+        self._compact()
+
+    def _compact(self):
+        # Caller holds self._lock. Returns the number of events dropped
+        if not self.max_age_days or not self._ts:
+            return 0
+        cutoff = time.time() - self.max_age_days * 86400
+        drop = bisect.bisect_left(self._ts, cutoff)
+        if not drop:
+            return 0
+        for column in (self._ts, self._round, self._stage, self._kind, self._level):
+            del column[:drop]
+        first = bisect.bisect_left(self._start_ts, cutoff)
+        del self._start_ts[:first]
+        del self._start_round[:first]
+        self._round_start = {rnd: ts for rnd, ts in self._round_start.items() if ts >= cutoff}
+        if self.path:
+            # Replaced in one rename, so a crash leaves the old file or the new one
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                for i in range(len(self._ts)):
+                    f.write(self.RECORD.pack(self._ts[i], self._round[i], self._stage[i], self._kind[i], self._level[i]))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        return drop
+
+    def compact(self):
+        """
+        Drop events older than max_age_days from memory and from the file.
+        Returns the number of events dropped.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._compact()
+
+    def _append(self, ts, level, kind, rnd, stage):
+        self._ts.append(ts)
+        self._level.append(level)
+        self._kind.append(kind)
+        self._round.append(rnd)
+        self._stage.append(stage)
+        if kind in (JOIN, START) and rnd not in self._round_start:
+            self._round_start[rnd] = ts
+            self._start_ts.append(ts)
+            self._start_round.append(rnd)
+
+    def _is_duplicate(self, event):
+        """
+        Events arrive in time order; anything older than the newest stored
+        event, or identical to one at the same timestamp, was already stored
+        (re-read after a restart or a cold tail read).
+        """
+        if not self._ts:
+            return False
+        last = self._ts[-1]
+        if event.ts < last:
+            return True
+        i = len(self._ts) - 1
+        while i >= 0 and self._ts[i] == event.ts:
+            if self._kind[i] == event.kind and self._round[i] == event.round and self._stage[i] == event.stage:
+                return True
+            i -= 1
+        return False
+
+    def _ingest(self, lines):
+        # Caller holds self._lock
+        self._ensure_loaded()
+        records = []
+        for line in lines:
+            event = parse_line(line)
+            if event is None:
+                continue
+            if event.kind == HELLO:
+                self.identity = (event.peer_name, event.peer_id)
+            if self._is_duplicate(event):
+                continue
+            self._append(event.ts, event.level, event.kind, event.round, event.stage)
+            records.append(self.RECORD.pack(event.ts, event.round, event.stage, event.kind, event.level))
+        if records and self.path:
+            with open(self.path, "ab") as f:
+                f.write(b"".join(records))
+        return len(records)
+
+    def feed(self, lines):
+        """
+        Parse new log lines and append any tracked events.
+        Returns the number of events stored.
+        """
+        with self._lock:
+            if self._backfilling:
+                self._pending.extend(lines)
+                return 0
+            return self._ingest(lines)
+
+    def begin_backfill(self):
+        """
+        Hold live lines back until backfill() has replayed the existing log,
+        so events stay in time order.
+        """
+        with self._lock:
+            self._backfilling = True
+
+    def backfill(self, log_path, chunk_size=1024 * 1024):
+        """
+        Replay an existing log into the store, from the newest stored event
+        on (the whole file for an empty store), so events logged while the
+        bot was down are not lost.
+        Streams the file in chunks, so memory use does not depend on its size.
+        """
+        try:
+            with self._lock:
+                self._ensure_loaded()
+                since = self._ts[-1] if self._ts else None
+            with open(log_path, "rb") as f:
+                end = os.fstat(f.fileno()).st_size
+                if since is not None:
+                    f.seek(_offset_before(f, since, end))
+                    if f.tell():
+                        # Starts mid-line; that line is older than `since`
+                        f.readline()
+                partial = b""
+                while f.tell() < end:
+                    chunk = f.read(min(chunk_size, end - f.tell()))
+                    if not chunk:
+                        break
+                    parts = (partial + chunk).split(b"\n")
+                    partial = parts.pop()
+                    lines = [p.decode("utf-8", errors="ignore") for p in parts]
+                    with self._lock:
+                        self._ingest(lines)
+                if partial:
+                    with self._lock:
+                        self._ingest([partial.decode("utf-8", errors="ignore")])
+        except FileNotFoundError:
+            pass
+        finally:
+            with self._lock:
+                self._backfilling = False
+                pending, self._pending = self._pending, []
+                self._ingest(pending)
+                # A first run replays the whole log, however old
+                self._compact()
+
+    def events_between(self, start, end=None):
+        """
+        Return the SwarmEvents with start <= ts < end (datetimes or epoch seconds).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            lo = bisect.bisect_left(self._ts, to_epoch(start))
+            hi = len(self._ts) if end is None else bisect.bisect_left(self._ts, to_epoch(end))
+            return [
+                SwarmEvent(self._ts[i], self._level[i], self._kind[i], self._round[i], self._stage[i], None, None)
+                for i in range(lo, hi)
+            ]
+
+    def latest(self, kind):
+        """
+        Return the most recent SwarmEvent of the given kind, or None.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            for i in range(len(self._kind) - 1, -1, -1):
+                if self._kind[i] == kind:
+                    return SwarmEvent(self._ts[i], self._level[i], self._kind[i], self._round[i], self._stage[i], None, None)
+        return None
+
+    def round_started_at(self, round_no):
+        """
+        Return the epoch time round_no was first seen starting, or None.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._round_start.get(round_no)
+
+    def round_duration(self, round_no):
+        """
+        Seconds from the start of round_no to the start of the next seen round, or None.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            ts = self._round_start.get(round_no)
+            if ts is None:
+                return None
+            i = bisect.bisect_right(self._start_ts, ts)
+            if i >= len(self._start_ts):
+                return None
+            return self._start_ts[i] - ts
+
+    def rounds_completed_since(self, since):
+        """
+        Number of rounds that started at or after `since` and have since been
+        followed by another round.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            lo = bisect.bisect_left(self._start_ts, to_epoch(since))
+            return max(0, len(self._start_ts) - lo - 1)
+
+    def average_round_duration(self, since):
+        """
+        Average seconds per round over rounds started at or after `since`, or None.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            lo = bisect.bisect_left(self._start_ts, to_epoch(since))
+            count = len(self._start_ts) - lo
+            if count < 2:
+                return None
+            return (self._start_ts[-1] - self._start_ts[lo]) / (count - 1)
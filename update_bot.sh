@@ -22,6 +22,12 @@ fi
 cd "$HOME/gensyn-bot/" || { echo "Failed to cd into $HOME/gensyn-bot"; exit 1; }
 wget https://raw.githubusercontent.com/shairkhan2/gensyn-bot/refs/heads/main/bot.py -O bot.py
 
+# Download helper modules imported by bot.py
+for module in logtail.py swarm_log.py http_client.py eoa.py screen_capture.py screen_render.py scheduler.py async_core.py jobs.py outbox.py live_status.py wandb_watch.py backup_sync.py backup_store.py backup_bundle.py; do
+    echo "Downloading $module..."
+    wget https://raw.githubusercontent.com/shairkhan2/gensyn-bot/refs/heads/main/$module -O $module
+done
+
 # Download gensyn_launcher.sh
 echo "Downloading gensyn_launcher.sh..."
 wget https://raw.githubusercontent.com/shairkhan2/gensyn-bot/refs/heads/main/gensyn_launcher.sh -O gensyn_launcher.sh
@@ -32,14 +38,14 @@ echo "Downloading gensyn_watchdog.sh..."
 wget https://raw.githubusercontent.com/shairkhan2/gensyn-bot/refs/heads/main/gensyn_watchdog.sh -O gensyn_watchdog.sh
 chmod +x gensyn_watchdog.sh
 
-# Install/update Pillow in virtual environment
-echo "Installing Pillow..."
+# Install/update Pillow and aiohttp (used by ASYNC_MODE) in virtual environment
+echo "Installing Pillow and aiohttp..."
 if [ -d ".venv" ]; then
     source .venv/bin/activate
-    pip install --upgrade Pillow
+    pip install --upgrade Pillow aiohttp
     deactivate
 else
-    echo "Warning: Virtual environment not found, skipping Pillow install"
+    echo "Warning: Virtual environment not found, skipping Pillow/aiohttp install"
 fi
 
 # Enable and start the bot.service
@@ -0,0 +1,358 @@
+import os
+import re
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+import threading
+
+# inotify(7) event bits
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Start time embedded in wandb run directory names (run-20250101_120000-abc123)
+RUN_TIME_RE = re.compile(r"(\d{8}_\d{6})")
+
+# Where a wandb run keeps its .log files, relative to the run directory
+RUN_LOG_DIRS = ("", "files", "logs")
+
+# struct inotify_event: int wd; uint32 mask, cookie, len; char name[len]
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """
+    Minimal inotify binding over ctypes (Linux only).
+    Raises OSError if inotify is unavailable.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read(self, timeout=None):
+        """
+        Wait up to `timeout` seconds (None: forever) and return [(wd, mask, name)].
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", errors="ignore")
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class WandbWatcher:
+    """
+    Watches the wandb log directory for new run directories.
+    Only the top level is watched (inotify, or a cheap directory listing
+    every `poll_interval` seconds where inotify is unavailable), so the
+    files a run writes cost nothing. Runs present when the watcher starts
+    are taken as already seen. New runs are reported through
+    on_new_runs([names]) once no further run has appeared for `debounce`
+    seconds, so a burst is one call and each run is reported once.
+    The only state kept is the set of run directories that currently exist.
+    """
+
+    def __init__(self, path, on_new_runs, debounce=10, poll_interval=60, use_inotify=True):
+        self.path = path
+        self.on_new_runs = on_new_runs
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+        self._known = set()
+        self._pending = []
+        self._due = None
+        self._synced = False
+        self._thread = None
+
+    def _list_runs(self):
+        runs = set()
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                # Skips the latest-run symlink and loose files such as debug.log
+                if entry.is_dir(follow_symlinks=False):
+                    runs.add(entry.name)
+        return runs
+
+    def _found(self, name):
+        if name in self._known:
+            return
+        self._known.add(name)
+        self._pending.append(name)
+        self._due = time.monotonic() + self.debounce
+
+    def _sync(self, report):
+        """
+        Reconcile the known runs with a listing of the directory.
+        """
+        runs = self._list_runs()
+        for name in sorted(runs - self._known):
+            if report:
+                self._found(name)
+            else:
+                self._known.add(name)
+        self._known &= runs
+        self._synced = True
+
+    def _flush(self, force=False):
+        if not self._pending or (not force and time.monotonic() < self._due):
+            return
+        runs, self._pending = self._pending, []
+        try:
+            self.on_new_runs(runs)
+        except Exception as e:
+            logging.error(f"WANDB watcher callback failed: {str(e)}")
+
+    def _wait(self):
+        # Seconds until the pending report is due, or None if nothing is pending
+        if not self._pending:
+            return None
+        return max(0.0, self._due - time.monotonic())
+
+    def _watch_inotify(self, notify, report):
+        mask = IN_CREATE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+        wd = notify.add_watch(self.path, mask)
+        # Listed after the watch is in place, so nothing falls in between
+        self._sync(report)
+        while True:
+            for event_wd, event, name in notify.read(self._wait()):
+                if event & IN_Q_OVERFLOW:
+                    self._sync(True)
+                elif event_wd != wd:
+                    # Left over from a watch on an earlier incarnation of the directory
+                    continue
+                elif event & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    # Directory removed or moved away: wait for it to come back
+                    return
+                elif event & IN_ISDIR and event & (IN_CREATE | IN_MOVED_TO):
+                    self._found(name)
+                elif event & IN_ISDIR and event & (IN_DELETE | IN_MOVED_FROM):
+                    self._known.discard(name)
+            self._flush()
+
+    def _watch_polling(self, report):
+        while True:
+            self._sync(report)
+            report = True
+            self._flush()
+            wait = self._wait()
+            time.sleep(self.poll_interval if wait is None else min(wait, self.poll_interval))
+
+    def run(self):
+        """
+        Watch in the calling thread until the interpreter exits.
+        """
+        notify = None
+        if self.use_inotify:
+            try:
+                notify = Inotify()
+                self.mode = "inotify"
+            except Exception as e:
+                logging.error(f"inotify unavailable, polling {self.path} instead: {str(e)}")
+        if notify is None:
+            self.mode = "polling"
+        # Only runs that exist at startup are a baseline; after that,
+        # whatever appears (including a re-created directory) is new
+        report = False
+        while True:
+            if os.path.isdir(self.path):
+                try:
+                    if notify is not None:
+                        self._watch_inotify(notify, report)
+                    else:
+                        self._watch_polling(report)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logging.error(f"WANDB watcher error: {str(e)}")
+                # A failure before the first listing keeps the baseline pending
+                report = report or self._synced
+            else:
+                report = True
+            self._known = set()
+            self._flush(force=True)
+            time.sleep(self.poll_interval)
+
+    def start(self):
+        """
+        Run the watcher in a daemon thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="wandb-watch", daemon=True)
+            self._thread.start()
+
+
+class WandbIndex:
+    """
+    Index of the most recent wandb runs and their .log files.
+    The top-level directory is listed once; after that, new runs are added
+    as the watcher reports them and the oldest are dropped beyond
+    `max_runs`. A run's log files are found with a scandir of its few log
+    directories (not a walk of the whole tree) and re-listed at most every
+    `rescan_seconds`, so finding the newest log costs a handful of stats
+    no matter how many runs the node has accumulated.
+    """
+
+    def __init__(self, path, max_runs=10, rescan_seconds=60):
+        self.path = path
+        self.max_runs = max_runs
+        self.rescan_seconds = rescan_seconds
+        # run name -> {"key": start time, "logs": [paths], "scanned": monotonic time}
+        self._runs = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _run_key(self, name):
+        match = RUN_TIME_RE.search(name)
+        if match:
+            return match.group(1)
+        try:
+            return time.strftime("%Y%m%d_%H%M%S", time.localtime(os.stat(os.path.join(self.path, name)).st_mtime))
+        except OSError:
+            return ""
+
+    def _add(self, name):
+        # Caller holds self._lock
+        if name in self._runs:
+            return
+        self._runs[name] = {"key": self._run_key(name), "logs": None, "scanned": None}
+        if len(self._runs) > self.max_runs:
+            oldest = min(self._runs, key=lambda run: (self._runs[run]["key"], run))
+            del self._runs[oldest]
+
+    def _ensure_loaded(self):
+        # Caller holds self._lock
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with os.scandir(self.path) as entries:
+                names = [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except FileNotFoundError:
+            return
+        keyed = sorted(((self._run_key(name), name) for name in names), reverse=True)
+        for _, name in keyed[:self.max_runs]:
+            self._add(name)
+
+    def add_runs(self, names):
+        """
+        Add runs reported by the watcher.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            for name in names:
+                self._add(name)
+
+    def _scan_logs(self, name, run):
+        # Caller holds self._lock
+        now = time.monotonic()
+        if run["logs"] is not None and now - run["scanned"] < self.rescan_seconds:
+            return run["logs"]
+        logs = []
+        run_dir = os.path.join(self.path, name)
+        for sub in RUN_LOG_DIRS:
+            try:
+                with os.scandir(os.path.join(run_dir, sub)) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".log") and entry.is_file():
+                            logs.append(entry.path)
+            except FileNotFoundError:
+                continue
+        # A run that has not written a log yet is listed again next time
+        run["logs"] = logs or None
+        run["scanned"] = now
+        return logs
+
+    def _newest_log(self, name, run):
+        # Caller holds self._lock
+        newest = None
+        newest_mtime = None
+        for path in self._scan_logs(name, run):
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if newest_mtime is None or mtime > newest_mtime:
+                newest, newest_mtime = path, mtime
+        return newest
+
+    def _by_recency(self):
+        # Caller holds self._lock. Yields (name, run) for runs that still exist, newest first
+        for name in sorted(self._runs, key=lambda run: (self._runs[run]["key"], run), reverse=True):
+            if not os.path.isdir(os.path.join(self.path, name)):
+                del self._runs[name]
+                continue
+            yield name, self._runs[name]
+
+    def recent(self, n=None):
+        """
+        Return [(run name, newest .log path or None)], newest run first.
+        Runs whose directory has been deleted are dropped.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            result = []
+            for name, run in self._by_recency():
+                result.append((name, self._newest_log(name, run)))
+                if n is not None and len(result) >= n:
+                    break
+            return result
+
+    def log_for(self, name):
+        """
+        Newest .log of an indexed run, or None (also for names not in the index).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            run = self._runs.get(name)
+            return self._newest_log(name, run) if run is not None else None
+
+    def latest_log(self):
+        """
+        Newest .log of the newest run that has one, or None.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            for name, run in self._by_recency():
+                log_path = self._newest_log(name, run)
+                if log_path:
+                    return log_path
+            return None